@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import pandas as pd
 import io
+import threading
 import json
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from dotenv import load_dotenv
@@ -18,7 +19,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import our custom modules
-from utils.model_predict import predict_volatility
+from utils.model_predict import predict_volatility, warmup as warmup_models
 from utils.risk_analysis.risk_analyzer import RiskAnalyzer
 from utils.snaptrade_utils_production import ProductionSnapTradeManager, generate_user_id
 from utils.enhanced_volatility_estimator import EnhancedVolatilityEstimator
@@ -76,7 +77,10 @@ except Exception as e:
 async def startup_event():
     """Startup event for the application."""
     print("🚀 Starting Portfolio Volatility Predictor...")
-    print("📊 Models will be loaded on first request for optimal performance")
+    # Load models in the background: the server starts accepting requests right away, and
+    # a request that arrives mid-load waits on the model cache lock instead of loading again
+    threading.Thread(target=warmup_models, name="model-warmup", daemon=True).start()
+    print("📊 Models are loading in the background")
     print("🎯 API ready to receive requests!")
 
 @app.get("/")
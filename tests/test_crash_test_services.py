@@ -0,0 +1,52 @@
+"""
+Tests for the SQLite-backed price cache of the crash test services
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from utils.crash_test_services import PriceService, PriceStore
+
+
+class _StubTicker:
+    """Serves a fixed 30-day history with one missing close"""
+
+    calls = 0
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, start=None, end=None, **kwargs):
+        _StubTicker.calls += 1
+        closes = np.linspace(100.0, 130.0, 30)
+        closes[10] = np.nan
+        return pd.DataFrame({'Close': closes}, index=pd.bdate_range('2024-01-01', periods=30))
+
+
+class PriceServiceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        store = PriceStore(os.path.join(self.tmpdir.name, 'prices.db'))
+        self.service = PriceService(store)
+        self.service.cache_dir = os.path.join(self.tmpdir.name, 'price_cache')
+        _StubTicker.calls = 0
+
+    def test_cold_and_warm_fetch_return_identical_series(self):
+        with mock.patch('utils.crash_test_services.yf.Ticker', _StubTicker):
+            cold = self.service.get_adjusted_prices('TEST', '2024-01-01', '2024-03-01')
+            warm = self.service.get_adjusted_prices('TEST', '2024-01-01', '2024-03-01')
+
+        self.assertEqual(_StubTicker.calls, 1)
+        self.assertEqual(len(cold), 29)
+        pd.testing.assert_series_equal(cold, warm, check_names=False, check_freq=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
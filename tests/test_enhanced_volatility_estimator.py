@@ -0,0 +1,44 @@
+"""
+Tests for the portfolio path of the enhanced volatility estimator
+"""
+
+import unittest
+
+import pandas as pd
+
+from utils.enhanced_volatility_estimator import EnhancedVolatilityEstimator
+
+
+class _StubCorrelationAnalyzer:
+    """Returns a fixed analysis result instead of downloading prices"""
+
+    def __init__(self, result):
+        self.result = result
+
+    def analyze_portfolio_correlations(self, portfolio_df):
+        return self.result
+
+
+class PortfolioVolatilityTest(unittest.TestCase):
+
+    def test_non_psd_correlation_matrix_clamps_to_zero(self):
+        # Pairwise -1 between three assets is not a valid correlation matrix, and with
+        # equal weighted volatilities its quadratic form is negative
+        tickers = ['SPY', 'VOO', 'IVV']
+        matrix = {a: {b: 1.0 if a == b else -1.0 for b in tickers} for a in tickers}
+        estimator = EnhancedVolatilityEstimator(cache_dir=None)
+        estimator._correlation_analyzer = _StubCorrelationAnalyzer({
+            'success': True,
+            'average_correlation': -1.0,
+            'correlation_matrix': matrix,
+        })
+        portfolio_df = pd.DataFrame({'Ticker': tickers, 'Weight': [1 / 3] * 3})
+
+        result = estimator.estimate_portfolio_volatility_enhanced(portfolio_df, use_apis=False)
+
+        self.assertEqual(result['correlation_analysis']['method_used'], 'Real Correlation Matrix')
+        self.assertEqual(result['portfolio_volatility'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
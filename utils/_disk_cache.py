@@ -0,0 +1,58 @@
+"""
+File-backed TTL cache for external API responses
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional, Tuple
+
+
+class FileCache:
+    """JSON-on-disk cache of API payloads, one file per (provider, key)
+
+    Entries are written as {"ts": <epoch seconds>, "data": <payload>} under
+    {root}/{provider}/{md5}.json so cached responses survive process restarts.
+    """
+
+    def __init__(self, root: str = "data/api_cache"):
+        self.root = root
+
+    def _path(self, provider: str, key: str) -> str:
+        digest = hashlib.md5(f"{provider}:{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, provider, f"{digest}.json")
+
+    def get(self, provider: str, key: str, ttl: float) -> Optional[Tuple[float, Any]]:
+        """Return (timestamp, data) if a fresh entry exists, else None"""
+        path = self._path(provider, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            timestamp = float(entry["ts"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if time.time() - timestamp >= ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return timestamp, entry.get("data")
+
+    def set(self, provider: str, key: str, data: Any, timestamp: Optional[float] = None):
+        """Write an entry atomically; failures only cost the cache, never the caller"""
+        path = self._path(provider, key)
+        entry = {"ts": time.time() if timestamp is None else timestamp, "data": data}
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not write API cache entry {provider}/{key}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
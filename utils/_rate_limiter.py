@@ -0,0 +1,31 @@
+"""
+Sliding-window rate limiter for free-tier API quotas
+"""
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Allow at most `calls` acquisitions in any rolling `period` seconds
+
+    `try_acquire` never blocks: once the window is full the caller is expected to
+    skip the request (and fall back to other data) rather than wait out a quota.
+    """
+
+    def __init__(self, calls: int, period: float):
+        self.calls = calls
+        self.period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Record a call and return True if the window has room, else return False"""
+        now = time.monotonic()
+        with self._lock:
+            while self._timestamps and now - self._timestamps[0] >= self.period:
+                self._timestamps.popleft()
+            if len(self._timestamps) >= self.calls:
+                return False
+            self._timestamps.append(now)
+            return True
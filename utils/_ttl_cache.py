@@ -0,0 +1,51 @@
+"""
+Bounded in-memory cache with per-entry expiry and LRU eviction
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe LRU cache of (timestamp, data) entries
+
+    Expiry is checked lazily on read against the TTL passed by the caller (or the
+    default), so one cache can hold endpoints with different lifetimes. Once more
+    than maxsize entries are stored the least recently used one is evicted.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: Hashable, ttl: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """Return (timestamp, data) if key is present and fresh, else None"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key: Hashable, ttl: Optional[float] = None) -> Optional[Any]:
+        """Return cached data if key is present and fresh, else None"""
+        entry = self.get_entry(key, ttl)
+        return None if entry is None else entry[1]
+
+    def set(self, key: Hashable, data: Any, timestamp: Optional[float] = None):
+        """Store data, stamped now unless an original fetch time is given"""
+        with self._lock:
+            self._entries[key] = (time.time() if timestamp is None else timestamp, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -6,8 +6,23 @@ import numpy as np
 import yfinance as yf
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import sqlite3
+import threading
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; the NumPy drift formula is used instead
+    NUMBA_AVAILABLE = False
+
+# Upper bound on threads used to analyze scenarios concurrently
+MAX_SCENARIO_WORKERS = 8
+
+# Upper bound on threads used to fetch ticker prices concurrently
+MAX_FETCH_WORKERS = 8
 
 # Predefined crash test scenarios
 CRASH_SCENARIOS = {
@@ -37,31 +52,140 @@ CRASH_SCENARIOS = {
     }
 }
 
+# Scenario boundary strings parsed once at import (the dicts above stay JSON-serializable)
+_SCENARIO_DAYS = {
+    date: np.datetime64(date, 'D')
+    for scenario in CRASH_SCENARIOS.values()
+    for date in (scenario['start'], scenario['end'])
+}
+
+def _to_day(value: Any) -> np.datetime64:
+    """Convert a date string or timestamp to a timezone-naive datetime64[D]"""
+    day = _SCENARIO_DAYS.get(value) if isinstance(value, str) else None
+    if day is None:
+        day = np.datetime64(pd.Timestamp(value).date(), 'D')
+    return day
+
+def _count_business_days(start_date: Any, end_date: Any) -> int:
+    """Count business days from start_date through end_date, inclusive"""
+    return max(0, int(np.busday_count(_to_day(start_date), _to_day(end_date) + 1)))
+
+def _portfolio_returns_drifting(returns: np.ndarray, weights: np.ndarray, idle_weight: float) -> np.ndarray:
+    """Single-pass drift kernel: daily portfolio return, then grow and renormalize weights"""
+    n_days, n_assets = returns.shape
+    portfolio_returns = np.empty(n_days)
+    current_weights = weights.copy()
+    
+    for t in range(n_days):
+        daily_return = 0.0
+        for i in range(n_assets):
+            daily_return += current_weights[i] * returns[t, i]
+        portfolio_returns[t] = daily_return
+        
+        total_weight = idle_weight
+        for i in range(n_assets):
+            current_weights[i] *= 1.0 + returns[t, i]
+            total_weight += current_weights[i]
+        
+        if total_weight > 0:
+            for i in range(n_assets):
+                current_weights[i] /= total_weight
+            idle_weight /= total_weight
+    
+    return portfolio_returns
+
+if NUMBA_AVAILABLE:
+    _portfolio_returns_drifting = njit(cache=True, fastmath=True)(_portfolio_returns_drifting)
+
+class PriceStore:
+    """SQLite store of daily adjusted closes keyed by (ticker, date)
+    
+    Fetched (ticker, start, end) windows are recorded so any request contained in an
+    already fetched window is answered from disk, and overlapping windows share rows.
+    """
+    
+    def __init__(self, db_path: str = "data/prices.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        
+        # One connection shared across scenario threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                "ticker TEXT NOT NULL, date TEXT NOT NULL, adj REAL NOT NULL, "
+                "PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fetched_windows ("
+                "ticker TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL, "
+                "PRIMARY KEY (ticker, start, end)) WITHOUT ROWID"
+            )
+    
+    @staticmethod
+    def _day(value: Any) -> str:
+        """Normalize a date-like value to an ISO YYYY-MM-DD string"""
+        return str(_to_day(value))
+    
+    def has_window(self, ticker: str, start_date: str, end_date: str) -> bool:
+        """Whether [start_date, end_date) lies inside a window already fetched for ticker"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM fetched_windows WHERE ticker = ? AND start <= ? AND end >= ? LIMIT 1",
+                (ticker, self._day(start_date), self._day(end_date))
+            ).fetchone()
+        return row is not None
+    
+    def get_prices(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
+        """Stored closes for ticker in [start_date, end_date), matching yfinance's exclusive end"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, adj FROM prices WHERE ticker = ? AND date >= ? AND date < ? ORDER BY date",
+                (ticker, self._day(start_date), self._day(end_date))
+            ).fetchall()
+        if not rows:
+            return pd.Series(dtype=float)
+        dates, values = zip(*rows)
+        return pd.Series(values, index=pd.DatetimeIndex(dates), dtype=float)
+    
+    def put_prices(self, ticker: str, start_date: str, end_date: str, prices: pd.Series):
+        """Store closes for ticker and record [start_date, end_date) as fetched"""
+        rows = list(zip([ticker] * len(prices), prices.index.strftime('%Y-%m-%d'), prices.astype(float)))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO prices (ticker, date, adj) VALUES (?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO fetched_windows (ticker, start, end) VALUES (?, ?, ?)",
+                (ticker, self._day(start_date), self._day(end_date))
+            )
+
 class PriceService:
     """Service for fetching and managing price data"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[PriceStore] = None):
+        # Per-window CSVs from the previous cache layout are still read to seed the store
         self.cache_dir = "data/price_cache"
-        os.makedirs(self.cache_dir, exist_ok=True)
+        self.store = store or PriceStore()
     
     def get_adjusted_prices(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
-        """Fetch adjusted close prices for a ticker"""
+        """Fetch adjusted close prices for a ticker
+        
+        Prices are returned as float32; stress-test metrics don't need double precision
+        and it halves the memory traffic of the aligned returns matrix.
+        """
         try:
-            # Try to load from cache first
-            cache_file = f"{self.cache_dir}/{ticker}_{start_date}_{end_date}.csv"
-            if os.path.exists(cache_file):
-                df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-                # Use Close if Adj Close is not available
-                if 'Adj Close' in df.columns:
-                    return df['Adj Close']
-                elif 'Close' in df.columns:
-                    return df['Close']
-                else:
-                    return pd.Series(dtype=float)
+            # Try to load from the price store first
+            if self.store.has_window(ticker, start_date, end_date):
+                return self.store.get_prices(ticker, start_date, end_date).astype(np.float32)
             
-            # Fetch from Yahoo Finance
-            ticker_obj = yf.Ticker(ticker)
-            df = ticker_obj.history(start=start_date, end=end_date)
+            legacy_file = f"{self.cache_dir}/{ticker}_{start_date}_{end_date}.csv"
+            if os.path.exists(legacy_file):
+                df = pd.read_csv(legacy_file, index_col=0, parse_dates=True)
+            else:
+                # Fetch from Yahoo Finance
+                ticker_obj = yf.Ticker(ticker)
+                df = ticker_obj.history(start=start_date, end=end_date)
             
             # Ensure timezone-naive dates
             if not df.empty and df.index.tz is not None:
@@ -79,14 +203,28 @@ class PriceService:
                 print(f"No price data available for {ticker}")
                 return pd.Series(dtype=float)
             
+            # The store keeps no NaN closes, so drop them here too: a cold fetch must return
+            # the same series a later cache hit reads back
+            price_series = price_series.dropna()
+            
             # Cache the data
-            df.to_csv(cache_file)
+            self.store.put_prices(ticker, start_date, end_date, price_series)
             
-            return price_series
+            return price_series.astype(np.float32)
             
         except Exception as e:
             print(f"Error fetching prices for {ticker}: {e}")
             return pd.Series(dtype=float)
+    
+    def get_adjusted_prices_batch(self, tickers: List[str], start_date: str, end_date: str) -> Dict[str, pd.Series]:
+        """Fetch adjusted close prices for several tickers over the same window"""
+        if len(tickers) <= 1:
+            return {ticker: self.get_adjusted_prices(ticker, start_date, end_date) for ticker in tickers}
+        
+        # yfinance requests spend their time waiting on the network, so overlap them
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(tickers))) as executor:
+            series = executor.map(lambda ticker: self.get_adjusted_prices(ticker, start_date, end_date), tickers)
+            return dict(zip(tickers, series))
 
 class PortfolioService:
     """Service for portfolio calculations and rebalancing"""
@@ -100,23 +238,37 @@ class PortfolioService:
         start_date: str, 
         end_date: str,
         rebalance: str = "none",
-        drift_handling: str = "renormDaily"
+        drift_handling: str = "renormDaily",
+        prices: Optional[Dict[Tuple[str, str, str], pd.Series]] = None
     ) -> Dict[str, Any]:
-        """Calculate portfolio returns with specified rebalancing strategy"""
+        """Calculate portfolio returns with specified rebalancing strategy
+        
+        `prices` optionally holds already fetched series keyed by (ticker, start, end);
+        tickers missing from it are fetched through the price service.
+        """
         
         # Get price data for all tickers
         ticker_data = {}
         coverage_data = {}
         
+        prices = prices or {}
+        missing_tickers = list(dict.fromkeys(
+            asset['ticker'] for asset in portfolio
+            if (asset['ticker'], start_date, end_date) not in prices
+        ))
+        fetched = self.price_service.get_adjusted_prices_batch(missing_tickers, start_date, end_date)
+        
         for asset in portfolio:
             ticker = asset['ticker']
-            prices = self.price_service.get_adjusted_prices(ticker, start_date, end_date)
+            ticker_prices = prices.get((ticker, start_date, end_date))
+            if ticker_prices is None:
+                ticker_prices = fetched[ticker]
             
-            if not prices.empty:
+            if not ticker_prices.empty:
                 # Calculate daily returns
-                returns = prices.pct_change().dropna()
+                returns = ticker_prices.pct_change().dropna()
                 ticker_data[ticker] = returns
-                coverage_data[ticker] = len(returns) / len(prices) if len(prices) > 0 else 0
+                coverage_data[ticker] = len(returns) / len(ticker_prices) if len(ticker_prices) > 0 else 0
             else:
                 coverage_data[ticker] = 0
         
@@ -130,18 +282,10 @@ class PortfolioService:
             }
         
         # Align all return series to common dates
-        all_dates = set()
-        for returns in ticker_data.values():
-            all_dates.update(returns.index)
-        
-        common_dates = sorted(all_dates)
-        aligned_returns = {}
-        
-        for ticker, returns in ticker_data.items():
-            aligned_returns[ticker] = returns.reindex(common_dates).fillna(0)
+        aligned_returns = pd.concat(ticker_data, axis=1).sort_index().fillna(0.0)
+        common_dates = aligned_returns.index
         
         # Calculate portfolio returns
-        portfolio_returns = pd.Series(0.0, index=common_dates)
         weights = {asset['ticker']: asset['weight'] for asset in portfolio}
         
         if rebalance == "none":
@@ -153,121 +297,111 @@ class PortfolioService:
         
         return {
             "returns": portfolio_returns,
-            "coverage": coverage_data,
-            "aligned_returns": aligned_returns
+            "coverage": coverage_data
         }
     
     def _calculate_drifting_returns(
         self, 
-        aligned_returns: Dict[str, pd.Series], 
+        aligned_returns: pd.DataFrame, 
         initial_weights: Dict[str, float], 
-        dates: List[datetime]
+        dates: pd.DatetimeIndex
     ) -> pd.Series:
         """Calculate returns with drifting weights (no rebalancing)"""
-        portfolio_returns = pd.Series(0.0, index=dates)
-        current_weights = initial_weights.copy()
-        
-        for i, date in enumerate(dates):
-            # Calculate portfolio return for this day
-            daily_return = 0.0
-            for ticker, returns in aligned_returns.items():
-                if ticker in current_weights:
-                    daily_return += current_weights[ticker] * returns[date]
-            
-            portfolio_returns[date] = daily_return
-            
-            # Update weights for next day (drift)
-            if i < len(dates) - 1:
-                for ticker, returns in aligned_returns.items():
-                    if ticker in current_weights:
-                        # Weight grows by (1 + return)
-                        current_weights[ticker] *= (1 + returns[date])
-                
-                # Renormalize weights to sum to 1
-                total_weight = sum(current_weights.values())
-                if total_weight > 0:
-                    for ticker in current_weights:
-                        current_weights[ticker] /= total_weight
+        weights = np.array([initial_weights[ticker] for ticker in aligned_returns.columns], dtype=float)
+        # Weight of tickers without price data stays in the total but never grows
+        idle_weight = sum(w for t, w in initial_weights.items() if t not in aligned_returns)
+        
+        portfolio_returns = self._drift_segment_returns(aligned_returns.values, weights, idle_weight)
         
-        return portfolio_returns
+        return pd.Series(portfolio_returns, index=dates)
     
     def _calculate_rebalanced_returns(
         self, 
-        aligned_returns: Dict[str, pd.Series], 
+        aligned_returns: pd.DataFrame, 
         target_weights: Dict[str, float], 
-        dates: List[datetime],
+        dates: pd.DatetimeIndex,
         rebalance_freq: str
     ) -> pd.Series:
         """Calculate returns with periodic rebalancing"""
-        portfolio_returns = pd.Series(0.0, index=dates)
-        current_weights = target_weights.copy()
-        
         # Determine rebalancing dates
         if rebalance_freq == "monthly":
             rebalance_dates = self._get_monthly_dates(dates)
         elif rebalance_freq == "quarterly":
             rebalance_dates = self._get_quarterly_dates(dates)
         else:
-            rebalance_dates = set()
-        
-        for i, date in enumerate(dates):
-            # Calculate portfolio return for this day
-            daily_return = 0.0
-            for ticker, returns in aligned_returns.items():
-                if ticker in current_weights:
-                    daily_return += current_weights[ticker] * returns[date]
-            
-            portfolio_returns[date] = daily_return
-            
-            # Rebalance if this is a rebalancing date
-            if date in rebalance_dates:
-                current_weights = target_weights.copy()
-            else:
-                # Update weights for next day (drift)
-                if i < len(dates) - 1:
-                    for ticker, returns in aligned_returns.items():
-                        if ticker in current_weights:
-                            current_weights[ticker] *= (1 + returns[date])
-                    
-                    # Renormalize weights to sum to 1
-                    total_weight = sum(current_weights.values())
-                    if total_weight > 0:
-                        for ticker in current_weights:
-                            current_weights[ticker] /= total_weight
-        
-        return portfolio_returns
-    
-    def _get_monthly_dates(self, dates: List[datetime]) -> set:
+            rebalance_dates = dates[:0].values
+
+        returns_matrix = aligned_returns.values
+        weights = np.array([target_weights[ticker] for ticker in aligned_returns.columns], dtype=float)
+        # Weight of tickers without price data stays in the total but never grows
+        idle_weight = sum(w for t, w in target_weights.items() if t not in aligned_returns)
+
+        # Weights reset to target the day after each rebalancing date, so split the
+        # returns into segments that each drift from the target weights
+        dates_arr = dates.values
+        split_idx = np.searchsorted(dates_arr, rebalance_dates) + 1
+        split_idx = split_idx[split_idx < len(dates_arr)]
+
+        segments = np.split(returns_matrix, split_idx)
+        portfolio_returns = np.concatenate([
+            self._drift_segment_returns(segment, weights, idle_weight) for segment in segments
+        ])
+
+        return pd.Series(portfolio_returns, index=dates)
+
+    @staticmethod
+    def _drift_segment_returns(returns: np.ndarray, weights: np.ndarray, idle_weight: float = 0.0) -> np.ndarray:
+        """Portfolio returns for a (T, N) block whose weights start at `weights` and drift daily"""
+        if len(returns) == 0:
+            return np.empty(0)
+
+        if NUMBA_AVAILABLE:
+            return _portfolio_returns_drifting(np.ascontiguousarray(returns), weights, float(idle_weight))
+
+        # Holdings grow by the cumulative return up to (not including) each day
+        growth = np.cumprod(1 + returns, axis=0)
+        held = weights * np.vstack([np.ones((1, returns.shape[1])), growth[:-1]])
+
+        # First day uses the raw weights; later days are renormalized to sum to 1
+        # (sums accumulate in float64 even when the returns matrix is float32)
+        totals = held.sum(axis=1, dtype=np.float64) + idle_weight
+        totals[0] = 1.0
+        totals[totals <= 0] = 1.0
+
+        return (held * returns).sum(axis=1, dtype=np.float64) / totals
+
+    def _get_monthly_dates(self, dates: pd.DatetimeIndex) -> np.ndarray:
         """Get first trading day of each month"""
-        monthly_dates = set()
-        current_month = None
-        
-        for date in dates:
-            if current_month != date.month:
-                monthly_dates.add(date)
-                current_month = date.month
-        
-        return monthly_dates
+        return dates.to_series().groupby(dates.to_period('M')).first().values
     
-    def _get_quarterly_dates(self, dates: List[datetime]) -> set:
+    def _get_quarterly_dates(self, dates: pd.DatetimeIndex) -> np.ndarray:
         """Get first trading day of each quarter"""
-        quarterly_dates = set()
-        current_quarter = None
-        
-        for date in dates:
-            quarter = (date.month - 1) // 3 + 1
-            if current_quarter != quarter:
-                quarterly_dates.add(date)
-                current_quarter = quarter
-        
-        return quarterly_dates
+        return dates.to_series().groupby(dates.to_period('Q')).first().values
 
 class MetricsService:
     """Service for calculating portfolio metrics"""
     
     @staticmethod
-    def calculate_metrics(returns: pd.Series) -> Dict[str, Any]:
-        """Calculate comprehensive portfolio metrics"""
+    def _compute_curves(returns: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+        """Calculate the equity curve and drawdown (as a fraction of the running peak)"""
+        equity_curve = (1 + returns.fillna(0)).cumprod()
+        return equity_curve, MetricsService._drawdown(equity_curve.values)
+    
+    @staticmethod
+    def _drawdown(equity: np.ndarray) -> np.ndarray:
+        """Drawdown from the running peak, computed directly on the equity array"""
+        return equity / np.maximum.accumulate(equity) - 1.0
+    
+    @staticmethod
+    def calculate_metrics(
+        returns: pd.Series,
+        equity_curve: Optional[pd.Series] = None,
+        drawdown: Optional[np.ndarray] = None
+    ) -> Dict[str, Any]:
+        """Calculate comprehensive portfolio metrics
+        
+        Pass `equity_curve`/`drawdown` from `_compute_curves` to reuse curves already computed.
+        """
         if returns.empty:
             return {
                 "cumReturnPct": 0.0,
@@ -279,14 +413,15 @@ class MetricsService:
                 "sharpeLite": 0.0
             }
         
-        # Calculate equity curve
-        equity_curve = (1 + returns.fillna(0)).cumprod()
+        # Calculate equity curve and drawdown
+        if equity_curve is None or drawdown is None:
+            equity_curve, drawdown = MetricsService._compute_curves(returns)
         
         # Cumulative return
         cum_return_pct = (equity_curve.iloc[-1] - 1) * 100
         
         # Max drawdown and recovery
-        max_dd, recovery_days, drawdown_series = MetricsService._calculate_max_drawdown(equity_curve)
+        max_dd, recovery_days = MetricsService._calculate_max_drawdown(equity_curve, drawdown)
         
         # Worst periods
         worst_day_pct = returns.min() * 100
@@ -310,67 +445,58 @@ class MetricsService:
         }
     
     @staticmethod
-    def _calculate_max_drawdown(equity_curve: pd.Series) -> Tuple[float, Optional[int], pd.Series]:
+    def _calculate_max_drawdown(
+        equity_curve: pd.Series,
+        drawdown: Optional[np.ndarray] = None
+    ) -> Tuple[float, Optional[int]]:
         """Calculate maximum drawdown and time to recovery from peak to recovery"""
-        peaks = equity_curve.cummax()
-        drawdown = equity_curve / peaks - 1.0
+        equity = equity_curve.values
+        if drawdown is None:
+            drawdown = MetricsService._drawdown(equity)
         
         # Find maximum drawdown
-        max_dd = drawdown.min()
-        trough_date = drawdown.idxmin()
+        trough_idx = int(np.argmin(drawdown))
+        max_dd = drawdown[trough_idx]
         
         # Find peak before trough (this is the peak we need to recover to)
-        peak_before = peaks.loc[:trough_date].idxmax()
-        peak_value = peaks.loc[peak_before]
+        peak_idx = int(np.argmax(equity[:trough_idx + 1]))
+        peak_before = equity_curve.index[peak_idx]
+        peak_value = equity[peak_idx]
         
         # Calculate time to recovery FROM PEAK (not from trough)
         recovery_days = None
-        if peak_before < equity_curve.index[-1]:
-            # Look for the first time equity recovers to peak value AFTER falling below it
-            # We need to find where equity first goes below peak, then recovers
-            equity_after_peak = equity_curve.loc[peak_before:]
+        # Find the first time equity goes below peak value
+        below_peak = equity[peak_idx:] < peak_value
+        if below_peak.any():
+            first_below_idx = peak_idx + int(np.argmax(below_peak))
             
-            # Find the first time equity goes below peak value
-            below_peak_mask = equity_after_peak < peak_value
-            if below_peak_mask.any():
-                first_below_peak = below_peak_mask[below_peak_mask].index[0]
+            # Now look for recovery after that point (first index back at or above the peak)
+            recovered = equity[first_below_idx:] >= peak_value
+            if recovered.any():
+                recovery_date = equity_curve.index[first_below_idx + int(np.argmax(recovered))]
                 
-                # Now look for recovery after that point
-                recovery_mask = equity_curve.loc[first_below_peak:] >= peak_value
-                if recovery_mask.any():
-                    # Find the first True value (actual recovery point)
-                    recovery_indices = recovery_mask[recovery_mask].index
-                    if len(recovery_indices) > 0:
-                        recovery_date = recovery_indices[0]
-                        # Calculate business days from peak to recovery (exclusive of peak date)
-                        # Ensure we're working with pandas Timestamps and timezone-naive
-                        start_date = pd.Timestamp(peak_before)
-                        if start_date.tz is not None:
-                            start_date = start_date.tz_localize(None)
-                        start_date = start_date + pd.Timedelta(days=1)
-                        
-                        end_date = pd.Timestamp(recovery_date)
-                        if end_date.tz is not None:
-                            end_date = end_date.tz_localize(None)
-                            
-                        business_days = len(pd.date_range(start_date, end_date, freq='B'))
-                        recovery_days = business_days
-        
-        return float(max_dd), recovery_days, drawdown
-        
-        return float(max_dd), recovery_days, drawdown
+                # Calculate business days from peak to recovery (exclusive of peak date)
+                start_date = pd.Timestamp(peak_before) + pd.Timedelta(days=1)
+                recovery_days = _count_business_days(start_date, recovery_date)
+        
+        return float(max_dd), recovery_days
     
     @staticmethod
     def _calculate_worst_month(returns: pd.Series) -> float:
         """Calculate worst monthly return"""
         try:
-            monthly_returns = returns.resample('ME').apply(lambda x: (1 + x).prod() - 1)
-            return monthly_returns.min()
+            # Compound daily returns per month as a sum of log returns (clip guards log1p(-1))
+            monthly_returns = np.expm1(np.log1p(returns.clip(lower=-0.9999)).resample('ME').sum())
+            return float(monthly_returns.min())
         except:
             return 0.0
     
     @staticmethod
-    def generate_series_data(returns: pd.Series) -> Dict[str, List]:
+    def generate_series_data(
+        returns: pd.Series,
+        equity_curve: Optional[pd.Series] = None,
+        drawdown: Optional[np.ndarray] = None
+    ) -> Dict[str, List]:
         """Generate time series data for charts"""
         if returns.empty:
             return {
@@ -379,17 +505,15 @@ class MetricsService:
                 "drawdown": []
             }
         
-        # Calculate equity curve
-        equity_curve = (1 + returns.fillna(0)).cumprod()
-        
-        # Calculate drawdown series
-        peaks = equity_curve.cummax()
-        drawdown_series = (equity_curve / peaks - 1.0) * 100
+        # Calculate equity curve and drawdown series
+        if equity_curve is None or drawdown is None:
+            equity_curve, drawdown = MetricsService._compute_curves(returns)
+        drawdown_series = drawdown * 100
         
         return {
-            "dates": [d.strftime('%Y-%m-%d') for d in returns.index],
-            "equity": [float(round(v, 4)) for v in equity_curve.values],
-            "drawdown": [float(round(v, 2)) for v in drawdown_series.values]
+            "dates": returns.index.strftime('%Y-%m-%d').tolist(),
+            "equity": np.round(equity_curve.values, 4).tolist(),
+            "drawdown": np.round(drawdown_series, 2).tolist()
         }
 
 
@@ -401,6 +525,11 @@ class CrashTestService:
         self.price_service = PriceService()
         self.portfolio_service = PortfolioService(self.price_service)
         self.metrics_service = MetricsService()
+        
+        # Benchmark results keyed by (benchmark, scenario id, start, end, rebalance, drift handling).
+        # Stored windows are never rewritten, so a successful result stays valid.
+        self._benchmark_cache: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._benchmark_cache_lock = threading.Lock()
     
     def run_crash_test(
         self,
@@ -416,40 +545,76 @@ class CrashTestService:
             "benchmarks": {}
         }
         
-        # Calculate overall portfolio coverage
+        # Fetch every (ticker, scenario) window once, shared by coverage, scenarios and benchmarks
         all_tickers = [asset['ticker'] for asset in portfolio]
-        coverage_summary = self._calculate_portfolio_coverage(all_tickers, scenarios)
+        fetch_tickers = list(dict.fromkeys(all_tickers + [
+            asset['ticker']
+            for benchmark in options.get("benchmarks") or []
+            for asset in self._benchmark_portfolio(benchmark)
+        ]))
+        prices = self._prefetch_prices(fetch_tickers, scenarios)
+        
+        # Calculate overall portfolio coverage
+        coverage_summary = self._calculate_portfolio_coverage(all_tickers, scenarios, prices)
         results["portfolioCoverage"] = coverage_summary
         
-        # Run analysis for each scenario
-        for scenario in scenarios:
-            scenario_result = self._analyze_scenario(portfolio, scenario, options)
-            results["scenarios"].append(scenario_result)
+        # Run analysis for each scenario (independent, mostly I/O and GIL-releasing pandas work)
+        with ThreadPoolExecutor(max_workers=self._scenario_workers(len(scenarios))) as executor:
+            futures = [
+                executor.submit(self._analyze_scenario, portfolio, scenario, options, prices)
+                for scenario in scenarios
+            ]
+            results["scenarios"] = [future.result() for future in futures]
         
         # Add benchmark comparisons if requested
         if options.get("benchmarks"):
-            benchmark_results = self._calculate_benchmarks(scenarios, options)
+            benchmark_results = self._calculate_benchmarks(scenarios, options, prices)
             results["benchmarks"] = benchmark_results
         
         return results
     
-    def _calculate_portfolio_coverage(self, tickers: List[str], scenarios: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @staticmethod
+    def _scenario_workers(task_count: int) -> int:
+        """Number of threads to use for a batch of scenario analyses"""
+        return max(1, min(MAX_SCENARIO_WORKERS, task_count))
+    
+    def _prefetch_prices(
+        self, 
+        tickers: List[str], 
+        scenarios: List[Dict[str, Any]]
+    ) -> Dict[Tuple[str, str, str], pd.Series]:
+        """Fetch prices for every ticker and scenario window, keyed by (ticker, start, end)"""
+        prices = {}
+        
+        for scenario in scenarios:
+            start_date, end_date = scenario['start'], scenario['end']
+            batch = self.price_service.get_adjusted_prices_batch(tickers, start_date, end_date)
+            for ticker, series in batch.items():
+                prices[(ticker, start_date, end_date)] = series
+        
+        return prices
+    
+    def _calculate_portfolio_coverage(
+        self, 
+        tickers: List[str], 
+        scenarios: List[Dict[str, Any]],
+        prices: Optional[Dict[Tuple[str, str, str], pd.Series]] = None
+    ) -> Dict[str, Any]:
         """Calculate data coverage for portfolio across all scenarios"""
         coverage_by_ticker = {}
         
         for ticker in tickers:
             ticker_coverage = []
             for scenario in scenarios:
-                prices = self.price_service.get_adjusted_prices(
-                    ticker, scenario['start'], scenario['end']
-                )
-                if not prices.empty:
+                ticker_prices = (prices or {}).get((ticker, scenario['start'], scenario['end']))
+                if ticker_prices is None:
+                    ticker_prices = self.price_service.get_adjusted_prices(
+                        ticker, scenario['start'], scenario['end']
+                    )
+                if not ticker_prices.empty:
                     # Calculate coverage as percentage of expected trading days
-                    # Ensure timezone-naive dates for date_range
-                    start_date = pd.to_datetime(scenario['start']).tz_localize(None) if pd.to_datetime(scenario['start']).tz is not None else pd.to_datetime(scenario['start'])
-                    end_date = pd.to_datetime(scenario['end']).tz_localize(None) if pd.to_datetime(scenario['end']).tz is not None else pd.to_datetime(scenario['end'])
-                    expected_days = len(pd.date_range(start_date, end_date, freq='B'))
-                    actual_days = len(prices)
+                    expected_days = _count_business_days(scenario['start'], scenario['end'])
+                    actual_days = len(ticker_prices)
                     coverage = min(actual_days / expected_days, 1.0) if expected_days > 0 else 0.0
                     ticker_coverage.append(coverage)
                 else:
@@ -471,7 +636,8 @@ class CrashTestService:
         self, 
         portfolio: List[Dict[str, Any]], 
         scenario: Dict[str, Any], 
-        options: Dict[str, Any]
+        options: Dict[str, Any],
+        prices: Optional[Dict[Tuple[str, str, str], pd.Series]] = None
     ) -> Dict[str, Any]:
         """Analyze a single crash scenario"""
         
@@ -482,7 +648,8 @@ class CrashTestService:
                 start_date=scenario['start'],
                 end_date=scenario['end'],
                 rebalance=options.get('rebalance', 'none'),
-                drift_handling=options.get('driftHandling', 'renormDaily')
+                drift_handling=options.get('driftHandling', 'renormDaily'),
+                prices=prices
             )
             
             if "error" in portfolio_result:
@@ -500,11 +667,15 @@ class CrashTestService:
                     "coveragePct": 0.0
                 }
             
+            # Equity and drawdown curves are shared by the metrics and the chart series
+            returns = portfolio_result["returns"]
+            equity_curve, drawdown = self.metrics_service._compute_curves(returns)
+            
             # Calculate metrics
-            metrics = self.metrics_service.calculate_metrics(portfolio_result["returns"])
+            metrics = self.metrics_service.calculate_metrics(returns, equity_curve, drawdown)
             
             # Generate series data
-            series_data = self.metrics_service.generate_series_data(portfolio_result["returns"])
+            series_data = self.metrics_service.generate_series_data(returns, equity_curve, drawdown)
             
             # Calculate scenario coverage
             scenario_coverage = self._calculate_scenario_coverage(portfolio_result["coverage"])
@@ -535,30 +706,53 @@ class CrashTestService:
     def _calculate_benchmarks(
         self, 
         scenarios: List[Dict[str, Any]], 
-        options: Dict[str, Any]
+        options: Dict[str, Any],
+        prices: Optional[Dict[Tuple[str, str, str], pd.Series]] = None
     ) -> Dict[str, Any]:
         """Calculate benchmark performance for comparison"""
-        benchmarks = {}
-        benchmark_tickers = options.get("benchmarks", [])
-        
-        for benchmark in benchmark_tickers:
-            if benchmark == "60_40":
-                # Create 60/40 portfolio
-                benchmark_portfolio = [
-                    {"ticker": "SPY", "weight": 0.6},
-                    {"ticker": "AGG", "weight": 0.4}
-                ]
-            else:
-                # Single ticker benchmark
-                benchmark_portfolio = [{"ticker": benchmark, "weight": 1.0}]
-            
-            benchmark_results = []
-            for scenario in scenarios:
-                scenario_result = self._analyze_scenario(
-                    benchmark_portfolio, scenario, options
+        benchmark_tickers = list(dict.fromkeys(options.get("benchmarks", [])))
+        option_key = (options.get('rebalance', 'none'), options.get('driftHandling', 'renormDaily'))
+        
+        tasks = [
+            ((benchmark, scenario['id'], scenario['start'], scenario['end']) + option_key, benchmark, scenario)
+            for benchmark in benchmark_tickers
+            for scenario in scenarios
+        ]
+        
+        with self._benchmark_cache_lock:
+            results = {key: self._benchmark_cache[key] for key, _, _ in tasks if key in self._benchmark_cache}
+        pending = [task for task in tasks if task[0] not in results]
+        
+        with ThreadPoolExecutor(max_workers=self._scenario_workers(len(pending))) as executor:
+            futures = {
+                key: executor.submit(
+                    self._analyze_scenario, self._benchmark_portfolio(benchmark), scenario, options, prices
                 )
-                benchmark_results.append(scenario_result)
-            
-            benchmarks[benchmark] = benchmark_results
+                for key, benchmark, scenario in pending
+            }
+            computed = {key: future.result() for key, future in futures.items()}
+        
+        # Only cache successful analyses; failures may be transient fetch errors
+        with self._benchmark_cache_lock:
+            self._benchmark_cache.update(
+                {key: result for key, result in computed.items() if "error" not in result}
+            )
+        results.update(computed)
+        
+        benchmarks = {benchmark: [] for benchmark in benchmark_tickers}
+        for key, benchmark, _ in tasks:
+            benchmarks[benchmark].append(results[key])
         
         return benchmarks
+    
+    @staticmethod
+    def _benchmark_portfolio(benchmark: str) -> List[Dict[str, Any]]:
+        """Portfolio definition for a benchmark id"""
+        if benchmark == "60_40":
+            # Create 60/40 portfolio
+            return [
+                {"ticker": "SPY", "weight": 0.6},
+                {"ticker": "AGG", "weight": 0.4}
+            ]
+        # Single ticker benchmark
+        return [{"ticker": benchmark, "weight": 1.0}]
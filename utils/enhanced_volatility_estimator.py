@@ -1,248 +1,623 @@
 import os
+import re
+import logging
+import math
 import pandas as pd
 import numpy as np
 import yfinance as yf
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import warnings
 import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
-from .risk_analysis.correlation_analyzer import CorrelationAnalyzer
+from ._disk_cache import FileCache
+from ._ttl_cache import TTLCache
+from ._rate_limiter import RateLimiter
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; the NumPy implementations are used instead
+    NUMBA_AVAILABLE = False
+    prange = range
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; requests' stdlib-json decoding is used instead
+    orjson = None
 
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Ticker lookups are I/O bound (yfinance + REST APIs), so they fan out on threads;
+# FMP / Alpha Vantage free tiers additionally get a cap on in-flight requests
+MAX_VOLATILITY_WORKERS = 8
+MAX_CONCURRENT_API_CALLS = 5
+# FMP accepts up to this many comma-separated symbols per historical-price-full request
+FMP_BATCH_SIZE = 5
+
+# Below this many assets a parallel reduction costs more in thread start-up than it saves
+PARALLEL_VARIANCE_MIN_ASSETS = 1024
+# Below this many assets a compiled loop beats the BLAS dispatch of u @ C @ u
+SMALL_QUADFORM_MAX_ASSETS = 32
+
+# Known-asset annualized volatilities, shared by every estimator instance
+_ENHANCED_VOL_MAP = {
+    # Major US Stocks
+    'AAPL': 0.25, 'MSFT': 0.22, 'GOOGL': 0.28, 'GOOG': 0.28, 'AMZN': 0.30,
+    'TSLA': 0.45, 'META': 0.35, 'NVDA': 0.40, 'AMD': 0.38, 'NFLX': 0.35,
+    'CRM': 0.32, 'ADBE': 0.28, 'PYPL': 0.38, 'INTC': 0.30, 'CSCO': 0.25,
+    'ORCL': 0.24, 'IBM': 0.22, 'HPE': 0.28, 'DELL': 0.30, 'VMW': 0.26,
+
+    # Financial Sector
+    'JPM': 0.28, 'BAC': 0.32, 'WFC': 0.30, 'GS': 0.35, 'MS': 0.38,
+    'C': 0.35, 'USB': 0.28, 'PNC': 0.26, 'TFC': 0.25, 'COF': 0.32,
+    'AXP': 0.30, 'V': 0.22, 'MA': 0.24, 'BRK-A': 0.18, 'BRK-B': 0.18,
+
+    # Healthcare & Biotech
+    'JNJ': 0.18, 'PFE': 0.22, 'ABBV': 0.25, 'MRK': 0.20, 'TMO': 0.22,
+    'UNH': 0.20, 'LLY': 0.28, 'AMGN': 0.26, 'GILD': 0.28, 'BIIB': 0.35,
+    'MRNA': 0.65, 'BNTX': 0.70, 'REGN': 0.32, 'VRTX': 0.30,
+
+    # Energy Sector
+    'XOM': 0.35, 'CVX': 0.32, 'COP': 0.40, 'EOG': 0.45, 'SLB': 0.42,
+    'KMI': 0.28, 'WMB': 0.30, 'OKE': 0.32, 'PSX': 0.38,
+
+    # Utilities (Low Volatility)
+    'NEE': 0.18, 'DUK': 0.16, 'SO': 0.15, 'D': 0.17, 'EXC': 0.20,
+    'XEL': 0.16, 'WEC': 0.15, 'ES': 0.18, 'PEG': 0.19,
+
+    # Consumer Staples (Low-Moderate Volatility)
+    'PG': 0.16, 'KO': 0.18, 'PEP': 0.17, 'WMT': 0.20, 'COST': 0.22,
+    'CL': 0.18, 'KHC': 0.25, 'GIS': 0.19, 'K': 0.21,
+
+    # REITs (Moderate Volatility)
+    'AMT': 0.22, 'CCI': 0.24, 'EQIX': 0.26, 'PLD': 0.23, 'WELL': 0.25,
+    'PSA': 0.21, 'EXR': 0.23, 'AVB': 0.24, 'EQR': 0.26,
+
+    # Broad Market ETFs
+    'SPY': 0.15, 'VOO': 0.15, 'IVV': 0.15, 'VTI': 0.16, 'ITOT': 0.16,
+    'SWTSX': 0.16, 'FXAIX': 0.15, 'VFIAX': 0.15,
+
+    # International ETFs
+    'VEA': 0.18, 'VWO': 0.24, 'IEFA': 0.18, 'IEMG': 0.24, 'EFA': 0.18,
+    'EEM': 0.24, 'ACWI': 0.17, 'VXUS': 0.18, 'FTIHX': 0.18,
+
+    # Sector ETFs
+    'XLK': 0.20, 'XLF': 0.25, 'XLE': 0.35, 'XLV': 0.18, 'XLI': 0.20,
+    'XLP': 0.15, 'XLU': 0.16, 'XLB': 0.22, 'XLRE': 0.22, 'XLY': 0.22,
+    'QQQ': 0.20, 'IWM': 0.22, 'MDY': 0.18,
+
+    # Bond ETFs (Low Volatility)
+    'AGG': 0.04, 'BND': 0.04, 'VGIT': 0.06, 'VGLT': 0.12, 'TLT': 0.12,
+    'IEF': 0.06, 'IEI': 0.04, 'SHY': 0.02, 'VGSH': 0.02, 'VCSH': 0.03,
+    'VCIT': 0.05, 'VCLT': 0.08, 'LQD': 0.06, 'HYG': 0.08, 'JNK': 0.08,
+    'TIP': 0.05, 'VTEB': 0.04, 'MUB': 0.04, 'SCHZ': 0.04,
+
+    # Treasury ETFs
+    'GOVT': 0.05, 'FXNAX': 0.04, 'FTRB': 0.03, 'SCHO': 0.02, 'SCHR': 0.04,
+    'SCHH': 0.06, 'VMBS': 0.03, 'MBB': 0.03,
+
+    # International Bond ETFs
+    'BNDX': 0.05, 'VWOB': 0.08, 'EMB': 0.09, 'PCY': 0.08, 'HYEM': 0.12,
+
+    # Commodity ETFs
+    'GLD': 0.18, 'SLV': 0.25, 'IAU': 0.18, 'PDBC': 0.20, 'DJP': 0.22,
+    'USO': 0.35, 'UNG': 0.45, 'DBA': 0.18, 'CORN': 0.25, 'WEAT': 0.28,
+
+    # Cryptocurrency (High Volatility) - Spot prices
+    'BTC': 0.65, 'ETH': 0.75, 'BTC-USD': 0.65, 'ETH-USD': 0.75, 'ADA': 0.80,
+    'SOL': 0.85, 'DOGE': 0.90, 'BNB': 0.70, 'XRP': 0.75, 'MATIC': 0.85,
+    'AVAX': 0.90, 'DOT': 0.80, 'LINK': 0.75,
+
+    # Leveraged ETFs (Very High Volatility)
+    'TQQQ': 0.60, 'SOXL': 0.80, 'SPXL': 0.45, 'UPRO': 0.45, 'TECL': 0.65,
+    'FAS': 0.70, 'TNA': 0.65, 'CURE': 0.60, 'DFEN': 0.55,
+
+    # Inverse ETFs (High Volatility)
+    'SQQQ': 0.60, 'SPXS': 0.45, 'SOXS': 0.80, 'FAZ': 0.70, 'TZA': 0.65,
+    'UVXY': 1.20, 'VXX': 0.90, 'SVXY': 0.85,
+
+    # Emerging Market Individual Stocks
+    'TSM': 0.30, 'ASML': 0.32, 'NVO': 0.25, 'TM': 0.22, 'SONY': 0.28,
+    'BABA': 0.45, 'JD': 0.50, 'PDD': 0.55, 'NIO': 0.70, 'XPEV': 0.75,
+    'LI': 0.75, 'BIDU': 0.40, 'NTES': 0.35,
+
+    # Popular Mutual Funds (Vanguard, Fidelity, etc.)
+    'VTIAX': 0.18, 'VBTLX': 0.04, 'SWAGX': 0.04, 'VTWAX': 0.17, 'VTSAX': 0.16,
+    'FZROX': 0.16, 'FZILX': 0.18,
+
+    # Bond Mutual Funds
+    'FTRBX': 0.03, 'PTTAX': 0.03, 'VFITX': 0.04, 'VTBIX': 0.05, 'FXSTX': 0.02,
+    'VBTIX': 0.04, 'FXTIX': 0.06,
+
+    # Equity Mutual Funds - Large Cap
+    'SWPPX': 0.15, 'FSKAX': 0.16, 'VINIX': 0.15,
+
+    # Equity Mutual Funds - Mid/Small Cap
+    'FSMDX': 0.20, 'VIMAX': 0.20, 'FSCSX': 0.24, 'VSMAX': 0.22, 'VTMGX': 0.18,
+
+    # International Mutual Funds
+    'VGTSX': 0.18, 'FDVV': 0.16,
+
+    # Target Date Funds (Age-based risk)
+    'FXIFX': 0.12, 'VTTSX': 0.12, 'FDKLX': 0.14, 'VTTHX': 0.14, 'FDEEX': 0.16,
+    'VFIFX': 0.16, 'FDEWX': 0.18, 'VTIVX': 0.18,
+
+    # Small-cap and Growth (Higher Volatility)
+    'VTWO': 0.24, 'VB': 0.22, 'IJR': 0.22, 'VUG': 0.18, 'VOOG': 0.18,
+    'IWF': 0.18, 'VTV': 0.14, 'VOOV': 0.14,
+
+    # Popular ARK ETFs (High Volatility Innovation)
+    'ARKK': 0.55, 'ARKQ': 0.50, 'ARKW': 0.52, 'ARKG': 0.48, 'ARKF': 0.50,
+}
+
+# Index over the map keys so a whole portfolio resolves in one hashed get_indexer call.
+# Values are float32 like the portfolio reduction arrays (~2 significant digits, so the
+# ~1e-8 drift, e.g. 0.15 -> 0.15000000596, is below what any result is shown at)
+_VOL_MAP_INDEX = pd.Index(list(_ENHANCED_VOL_MAP))
+_VOL_MAP_VALUES = np.fromiter(_ENHANCED_VOL_MAP.values(), dtype=np.float32, count=len(_ENHANCED_VOL_MAP))
+
+# Common crypto tickers -> Yahoo Finance spot symbols (so BTC resolves to BTC-USD, not an ETF)
+_CRYPTO_MAP = {
+    'BTC': 'BTC-USD',
+    'ETH': 'ETH-USD',
+    'ADA': 'ADA-USD',
+    'SOL': 'SOL-USD',
+    'DOGE': 'DOGE-USD',
+    'BNB': 'BNB-USD',
+    'XRP': 'XRP-USD',
+    'MATIC': 'MATIC-USD',
+    'AVAX': 'AVAX-USD',
+    'DOT': 'DOT-USD',
+    'LINK': 'LINK-USD',
+    'LTC': 'LTC-USD',
+    'BCH': 'BCH-USD',
+    'XLM': 'XLM-USD',
+    'VET': 'VET-USD',
+    'TRX': 'TRX-USD',
+    'ATOM': 'ATOM-USD',
+    'NEAR': 'NEAR-USD',
+    'FTM': 'FTM-USD',
+    'ALGO': 'ALGO-USD',
+    'ICP': 'ICP-USD',
+    'FIL': 'FIL-USD',
+    'THETA': 'THETA-USD',
+    'XTZ': 'XTZ-USD',
+    'EOS': 'EOS-USD',
+    'AAVE': 'AAVE-USD',
+    'UNI': 'UNI-USD',
+    'SUSHI': 'SUSHI-USD',
+    'COMP': 'COMP-USD',
+    'MKR': 'MKR-USD',
+    'YFI': 'YFI-USD',
+    'SNX': 'SNX-USD',
+    'CRV': 'CRV-USD',
+    'BAL': 'BAL-USD',
+    'REN': 'REN-USD',
+    'ZRX': 'ZRX-USD',
+    'BAT': 'BAT-USD',
+    'MANA': 'MANA-USD',
+    'SAND': 'SAND-USD',
+    'ENJ': 'ENJ-USD',
+    'CHZ': 'CHZ-USD',
+    'HOT': 'HOT-USD',
+    'ANKR': 'ANKR-USD',
+    'ONE': 'ONE-USD',
+    'HARMONY': 'ONE-USD',
+    'IOTA': 'IOTA-USD',
+    'NEO': 'NEO-USD',
+    'GAS': 'GAS-USD',
+    'ONT': 'ONT-USD',
+    'QTUM': 'QTUM-USD',
+    'ICX': 'ICX-USD',
+    'ZIL': 'ZIL-USD',
+    'ZEN': 'ZEN-USD',
+    'RVN': 'RVN-USD',
+    'XMR': 'XMR-USD',
+    'DASH': 'DASH-USD',
+    'ZEC': 'ZEC-USD',
+    'XEM': 'XEM-USD',
+    'WAVES': 'WAVES-USD',
+    'OMG': 'OMG-USD',
+    'KNC': 'KNC-USD',
+    'STORJ': 'STORJ-USD',
+    'SKL': 'SKL-USD',
+    'GRT': 'GRT-USD',
+    '1INCH': '1INCH-USD',
+    'CAKE': 'CAKE-USD',
+    'BAKE': 'BAKE-USD',
+    'DODO': 'DODO-USD',
+    'ALPHA': 'ALPHA-USD',
+    'PERP': 'PERP-USD',
+    'RLC': 'RLC-USD',
+    'OCEAN': 'OCEAN-USD',
+    'BAND': 'BAND-USD',
+    'NMR': 'NMR-USD',
+    'MLN': 'MLN-USD',
+    'REP': 'REP-USD',
+    'KEEP': 'KEEP-USD',
+    'NU': 'NU-USD',
+    'UMA': 'UMA-USD',
+    'BADGER': 'BADGER-USD',
+    'FARM': 'FARM-USD',
+    'PICKLE': 'PICKLE-USD',
+    'CREAM': 'CREAM-USD',
+    'COVER': 'COVER-USD',
+    'HEGIC': 'HEGIC-USD',
+    'API3': 'API3-USD',
+    'POND': 'POND-USD',
+}
+
+# Substring patterns used to classify assets that are not in the map (immutable: the
+# sets are shared by every estimator instance)
+_ASSET_TYPE_PATTERNS = {
+    'crypto_patterns': frozenset({
+        'BTC', 'ETH', 'ADA', 'SOL', 'DOGE', 'BNB', 'XRP', 'MATIC',
+        'AVAX', 'DOT', 'LINK', 'CRYPTO', '-USD'
+    }),
+    'bond_patterns': frozenset({
+        'AGG', 'BND', 'TLT', 'IEF', 'SHY', 'GOVT', 'BOND', 'TREAS',
+        'BILL', 'NOTE', 'FTRB', 'VMBS', 'MBB', 'VTEB', 'MUB', 'HYG',
+        'JNK', 'LQD', 'TIP', 'BNDX', 'EMB'
+    }),
+    'etf_patterns': frozenset({
+        'SPY', 'VOO', 'VTI', 'QQQ', 'IWM', 'XL', 'VE', 'VW', 'I',
+        'MDY', 'DIA', 'GLD', 'SLV', 'USO', 'TQQQ', 'SQQQ'
+    }),
+    'reit_patterns': frozenset({
+        'REIT', 'AMT', 'CCI', 'EQIX', 'PLD', 'WELL', 'PSA', 'EXR',
+        'AVB', 'EQR', 'VNQ', 'SCHH', 'XLRE'
+    }),
+    'mutual_fund_patterns': frozenset({
+        'VFIAX', 'FXAIX', 'SWTSX', 'VTIAX', 'FTIHX', 'VBTLX', 'FXNAX',
+        'SWAGX', 'VTWAX', 'VTSAX', 'FZROX', 'FZILX', 'FTRBX', 'PTTAX',
+        'VFITX', 'VTBIX', 'FXSTX', 'VBTIX', 'FXTIX', 'FSMDX', 'VIMAX',
+        'FSCSX', 'VSMAX', 'FSKAX', 'VTMGX', 'VGTSX', 'FDVV', 'FXIFX',
+        'VTTSX', 'FDKLX', 'VTTHX', 'FDEEX', 'VFIFX', 'FDEWX', 'VTIVX'
+    }),
+    'leveraged_patterns': frozenset({
+        'TQQQ', 'SOXL', 'SPXL', 'UPRO', 'TECL', 'FAS', 'TNA', 'CURE',
+        'SQQQ', 'SPXS', 'SOXS', 'FAZ', 'TZA', 'UVXY', 'VXX', 'SVXY'
+    })
+}
+
+# Sector-based average volatilities for unknown stocks
+_SECTOR_VOLS = {
+    'Technology': 0.30,
+    'Biotechnology': 0.45,
+    'Healthcare': 0.25,
+    'Financial Services': 0.30,
+    'Energy': 0.38,
+    'Utilities': 0.17,
+    'Consumer Staples': 0.18,
+    'Consumer Cyclical': 0.25,
+    'Industrial': 0.22,
+    'Materials': 0.26,
+    'Real Estate': 0.24,
+    'Communication Services': 0.28,
+    'Aerospace & Defense': 0.20,
+    # Mutual Fund Categories
+    'Bond Funds': 0.04,
+    'Large-Cap Equity': 0.15,
+    'Mid-Cap Equity': 0.20,
+    'Small-Cap Equity': 0.24,
+    'International Equity': 0.18,
+    'Target Date Funds': 0.14,
+    'Balanced Funds': 0.12
+}
+
+def _compile_asset_classifiers(patterns: Dict[str, frozenset]) -> Dict[str, re.Pattern]:
+    """Compile each substring pattern set into one alternation regex.
+    
+    A single `search` scans the symbol once in C instead of testing every
+    pattern with a Python-level `in` check. Patterns are sorted so the compiled
+    regex is identical across runs regardless of set iteration order.
+    """
+    return {
+        category: re.compile('|'.join(map(re.escape, sorted(items))) if items else r'(?!)')
+        for category, items in patterns.items()
+    }
+
+_ASSET_TYPE_REGEXES = _compile_asset_classifiers(_ASSET_TYPE_PATTERNS)
+
+def _classify_by_patterns(symbol_upper: str) -> Tuple[str, float]:
+    """Pattern-based asset type and base volatility for an upper-cased symbol"""
+    # Check for crypto
+    if _ASSET_TYPE_REGEXES['crypto_patterns'].search(symbol_upper):
+        return 'Cryptocurrency', 0.70
+
+    # Check for leveraged ETFs
+    if _ASSET_TYPE_REGEXES['leveraged_patterns'].search(symbol_upper):
+        return 'Leveraged ETF', 0.60
+
+    # Check for mutual funds (before bonds since some mutual funds contain bond patterns)
+    if _ASSET_TYPE_REGEXES['mutual_fund_patterns'].search(symbol_upper):
+        return 'Mutual Fund', 0.15
+
+    # Check for mutual fund patterns by suffix/structure
+    if (len(symbol_upper) == 5 and symbol_upper.endswith('X')) or \
+       (symbol_upper.startswith(('V', 'F', 'SW')) and len(symbol_upper) >= 5):
+        return 'Mutual Fund', 0.15
+
+    # Check for bonds
+    if _ASSET_TYPE_REGEXES['bond_patterns'].search(symbol_upper):
+        return 'Bond/Treasury', 0.05
+
+    # Check for REITs
+    if _ASSET_TYPE_REGEXES['reit_patterns'].search(symbol_upper):
+        return 'REIT', 0.24
+
+    # Check for ETFs
+    if _ASSET_TYPE_REGEXES['etf_patterns'].search(symbol_upper):
+        return 'ETF', 0.18
+
+    # Default to individual stock
+    return 'Stock', 0.25
+
+# Exact pattern symbols (SPY, TQQQ, VFIAX, ...) resolve with one dict lookup; values are
+# what the precedence-ordered scan returns for them, so overlaps keep their priority
+_EXACT_ASSET_TYPES = {
+    pattern: _classify_by_patterns(pattern)
+    for patterns in _ASSET_TYPE_PATTERNS.values()
+    for pattern in patterns
+}
+
+def _parse_json(response):
+    """Decode an API response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+@lru_cache(maxsize=4096)
+def _classify_upper(symbol_upper: str) -> Tuple[str, float]:
+    """classify_asset_type for a symbol the caller has already upper-cased (memoized)"""
+    exact = _EXACT_ASSET_TYPES.get(symbol_upper)
+    if exact is not None:
+        return exact
+    return _classify_by_patterns(symbol_upper)
+
+_CRYPTO_RE = _ASSET_TYPE_REGEXES['crypto_patterns']
+
+def _normalize_crypto_upper(symbol_upper: str) -> str:
+    """Map an upper-cased crypto symbol to its Yahoo spot pair (BTC -> BTC-USD)"""
+    spot = _CRYPTO_MAP.get(symbol_upper)
+    if spot is not None:
+        return spot
+    # Short alphabetic symbols that look like crypto get the -USD suffix
+    if (len(symbol_upper) <= 4 and symbol_upper.isalpha()
+            and _CRYPTO_RE.search(symbol_upper)):
+        return f"{symbol_upper}-USD"
+    return symbol_upper
+
+# Data sources whose estimates are worth memoizing (each one costs network calls)
+_LIVE_DATA_SOURCES = frozenset({
+    'Yahoo Finance Historical',
+    'Financial Modeling Prep',
+    'Alpha Vantage + Sector Model'
+})
+
+def _log_return_volatility(prices: np.ndarray, ddof: int) -> float:
+    """Single-pass annualized std of daily log returns (Welford update, no temporaries)"""
+    n_returns = prices.shape[0] - 1
+    mean = 0.0
+    m2 = 0.0
+    prev_log = np.log(prices[0])
+    for i in range(n_returns):
+        log_price = np.log(prices[i + 1])
+        r = log_price - prev_log
+        prev_log = log_price
+        delta = r - mean
+        mean += delta / (i + 1)
+        m2 += delta * (r - mean)
+    return np.sqrt(m2 / (n_returns - ddof)) * np.sqrt(252.0)
+
+if NUMBA_AVAILABLE:
+    _log_return_volatility = njit(cache=True, fastmath=True)(_log_return_volatility)
+
+def _constant_correlation_variance_kernel(weighted_vols: np.ndarray, correlation: float) -> float:
+    """sum_i (w_i s_i)^2 + rho * sum_{i!=j} w_i s_i w_j s_j in one parallel O(N) pass"""
+    total = 0.0
+    total_sq = 0.0
+    for i in prange(weighted_vols.shape[0]):
+        total += weighted_vols[i]
+        total_sq += weighted_vols[i] * weighted_vols[i]
+    return total_sq + correlation * (total * total - total_sq)
+
+if NUMBA_AVAILABLE:
+    _constant_correlation_variance_kernel = njit(parallel=True, fastmath=True, cache=True)(
+        _constant_correlation_variance_kernel
+    )
+
+def _constant_correlation_variance(weighted_vols: np.ndarray, correlation: float) -> float:
+    """Portfolio variance when every pair of assets shares the same correlation"""
+    if NUMBA_AVAILABLE and weighted_vols.shape[0] >= PARALLEL_VARIANCE_MIN_ASSETS:
+        return float(_constant_correlation_variance_kernel(
+            np.ascontiguousarray(weighted_vols, dtype=np.float64), float(correlation)
+        ))
+    # u @ u is a single dot with no squared temporary
+    variance_sum = float(weighted_vols @ weighted_vols)
+    total = float(weighted_vols.sum())
+    return variance_sum + correlation * (total * total - variance_sum)
+
+def _correlation_quadform_kernel(weighted_vols: np.ndarray, corr: np.ndarray) -> float:
+    """u' C u for a symmetric, unit-diagonal C, reading only its upper triangle"""
+    n = weighted_vols.shape[0]
+    total = 0.0
+    for i in range(n):
+        ui = weighted_vols[i]
+        row = 0.0
+        for j in range(i + 1, n):
+            row += weighted_vols[j] * corr[i, j]
+        total += ui * ui + 2.0 * ui * row
+    return total
+
+if NUMBA_AVAILABLE:
+    _correlation_quadform_kernel = njit(cache=True, fastmath=True)(_correlation_quadform_kernel)
+
+def _correlation_variance(weighted_vols: np.ndarray, corr: np.ndarray) -> float:
+    """Portfolio variance u' C u for a full correlation matrix C (symmetric, unit diagonal)"""
+    # Zero-weight (or zero-vol) rows and columns contribute nothing; keep the active block
+    active = np.flatnonzero(weighted_vols)
+    if active.shape[0] < weighted_vols.shape[0]:
+        weighted_vols = weighted_vols[active]
+        corr = corr[np.ix_(active, active)]
+    if NUMBA_AVAILABLE and weighted_vols.shape[0] < SMALL_QUADFORM_MAX_ASSETS:
+        return float(_correlation_quadform_kernel(
+            np.ascontiguousarray(weighted_vols, dtype=np.float64),
+            np.ascontiguousarray(corr, dtype=np.float64)
+        ))
+    return float(weighted_vols @ corr @ weighted_vols)
+
+def warmup_kernels():
+    """Compile the optional numba kernels now instead of on the first portfolio request"""
+    if not NUMBA_AVAILABLE:
+        return
+    _log_return_volatility(np.linspace(100.0, 101.0, 8), 1)
+    _correlation_quadform_kernel(np.array([0.5, 0.5]), np.eye(2))
+
+def _realized_volatility(prices, ddof: int = 1) -> float:
+    """Annualized realized volatility of a daily price series from its log returns"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.shape[0] <= ddof + 1 or not np.all(np.isfinite(prices) & (prices > 0)):
+        return float('nan')
+    if NUMBA_AVAILABLE:
+        return float(_log_return_volatility(prices, ddof))
+    return float(np.std(np.diff(np.log(prices)), ddof=ddof) * np.sqrt(252))
+
+def _accept_vol(volatility, low: float = 0.005, high: float = 3.0) -> bool:
+    """Sanity gate for a data-source estimate; rejected values fall through to the next source"""
+    return volatility is not None and bool(np.isfinite(volatility)) and low < volatility < high
+
+def _fmp_history_volatility(historical) -> Optional[float]:
+    """Realized volatility from an FMP `historical` bar list, or None if it is too short"""
+    if not historical or len(historical) <= 30:
+        return None
+    prices = [day['close'] for day in historical[-252:]]  # Last year
+    return _realized_volatility(prices, ddof=1)
+
 class EnhancedVolatilityEstimator:
-    def __init__(self, alpha_vantage_key=None, fmp_key=None):
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = (
+        'alpha_vantage_key', 'fmp_key', 'enhanced_volatility_map', 'asset_type_patterns',
+        'sector_volatilities', '_correlation_analyzer', '_cache_ttl', '_api_cache',
+        '_cache_ttls', '_disk_cache', '_estimate_cache', '_api_semaphore',
+        '_av_limiter', '_fmp_limiter', '_session'
+    )
+    
+    def __init__(self, alpha_vantage_key=None, fmp_key=None, cache_dir: Optional[str] = "data/api_cache"):
         """
         Enhanced volatility estimator using multiple data sources and ML-based classification.
         
         Args:
             alpha_vantage_key: Alpha Vantage API key (free tier: 25 calls/day)
             fmp_key: Financial Modeling Prep API key (free tier: 250 calls/day)
+            cache_dir: Directory for the persistent API cache (None keeps it in memory only)
         """
         # Load API keys from environment variables if not provided
         self.alpha_vantage_key = alpha_vantage_key or os.getenv('ALPHA_VANTAGE_KEY') or os.getenv('ALPHA_VANTAGE_API_KEY')
         self.fmp_key = fmp_key or os.getenv('FMP_KEY') or os.getenv('FMP_API_KEY')
         
-        # Initialize correlation analyzer for real correlation data
-        self.correlation_analyzer = CorrelationAnalyzer()
+        # Built on first portfolio estimate (see correlation_analyzer)
+        self._correlation_analyzer = None
         
         # Enhanced volatility database with more comprehensive coverage
-        self.enhanced_volatility_map = self._build_enhanced_volatility_map()
+        self.enhanced_volatility_map = _ENHANCED_VOL_MAP
         
         # Asset type classifiers
-        self.asset_type_patterns = self._build_asset_classifiers()
+        self.asset_type_patterns = _ASSET_TYPE_PATTERNS
         
         # Sector-based volatility averages
-        self.sector_volatilities = self._build_sector_volatilities()
-        
-        # Simple in-memory cache for API calls
-        self._api_cache = {}
-        self._cache_ttl = 3600  # 1 hour cache TTL
-        
-    def _get_cached_data(self, key: str) -> Optional[Dict]:
-        """Get data from cache if not expired."""
-        if key in self._api_cache:
-            timestamp, data = self._api_cache[key]
-            if time.time() - timestamp < self._cache_ttl:
-                return data
-            else:
-                del self._api_cache[key]
-        return None
-    
-    def _set_cached_data(self, key: str, data: Dict):
-        """Store data in cache with timestamp."""
-        self._api_cache[key] = (time.time(), data)
+        self.sector_volatilities = _SECTOR_VOLS
         
-    def _build_enhanced_volatility_map(self) -> Dict[str, float]:
-        """Build comprehensive volatility map covering more asset classes"""
-        return {
-            # Major US Stocks
-            'AAPL': 0.25, 'MSFT': 0.22, 'GOOGL': 0.28, 'GOOG': 0.28, 'AMZN': 0.30,
-            'TSLA': 0.45, 'META': 0.35, 'NVDA': 0.40, 'AMD': 0.38, 'NFLX': 0.35,
-            'CRM': 0.32, 'ADBE': 0.28, 'PYPL': 0.38, 'INTC': 0.30, 'CSCO': 0.25,
-            'ORCL': 0.24, 'IBM': 0.22, 'HPE': 0.28, 'DELL': 0.30, 'VMW': 0.26,
-            
-            # Financial Sector
-            'JPM': 0.28, 'BAC': 0.32, 'WFC': 0.30, 'GS': 0.35, 'MS': 0.38,
-            'C': 0.35, 'USB': 0.28, 'PNC': 0.26, 'TFC': 0.25, 'COF': 0.32,
-            'AXP': 0.30, 'V': 0.22, 'MA': 0.24, 'BRK-A': 0.18, 'BRK-B': 0.18,
-            
-            # Healthcare & Biotech
-            'JNJ': 0.18, 'PFE': 0.22, 'ABBV': 0.25, 'MRK': 0.20, 'TMO': 0.22,
-            'UNH': 0.20, 'LLY': 0.28, 'AMGN': 0.26, 'GILD': 0.28, 'BIIB': 0.35,
-            'MRNA': 0.65, 'BNTX': 0.70, 'REGN': 0.32, 'VRTX': 0.30,
-            
-            # Energy Sector
-            'XOM': 0.35, 'CVX': 0.32, 'COP': 0.40, 'EOG': 0.45, 'SLB': 0.42,
-            'KMI': 0.28, 'WMB': 0.30, 'OKE': 0.32, 'PSX': 0.38,
-            
-            # Utilities (Low Volatility)
-            'NEE': 0.18, 'DUK': 0.16, 'SO': 0.15, 'D': 0.17, 'EXC': 0.20,
-            'XEL': 0.16, 'WEC': 0.15, 'ES': 0.18, 'PEG': 0.19,
-            
-            # Consumer Staples (Low-Moderate Volatility)
-            'PG': 0.16, 'KO': 0.18, 'PEP': 0.17, 'WMT': 0.20, 'COST': 0.22,
-            'CL': 0.18, 'KHC': 0.25, 'GIS': 0.19, 'K': 0.21,
-            
-            # REITs (Moderate Volatility)
-            'AMT': 0.22, 'CCI': 0.24, 'EQIX': 0.26, 'PLD': 0.23, 'WELL': 0.25,
-            'PSA': 0.21, 'EXR': 0.23, 'AVB': 0.24, 'EQR': 0.26,
-            
-            # Broad Market ETFs
-            'SPY': 0.15, 'VOO': 0.15, 'IVV': 0.15, 'VTI': 0.16, 'ITOT': 0.16,
-            'SWTSX': 0.16, 'FXAIX': 0.15, 'VFIAX': 0.15,
-            
-            # International ETFs
-            'VEA': 0.18, 'VWO': 0.24, 'IEFA': 0.18, 'IEMG': 0.24, 'EFA': 0.18,
-            'EEM': 0.24, 'ACWI': 0.17, 'VXUS': 0.18, 'FTIHX': 0.18,
-            
-            # Sector ETFs
-            'XLK': 0.20, 'XLF': 0.25, 'XLE': 0.35, 'XLV': 0.18, 'XLI': 0.20,
-            'XLP': 0.15, 'XLU': 0.16, 'XLB': 0.22, 'XLRE': 0.22, 'XLY': 0.22,
-            'QQQ': 0.20, 'IWM': 0.22, 'MDY': 0.18,
-            
-            # Bond ETFs (Low Volatility)
-            'AGG': 0.04, 'BND': 0.04, 'VGIT': 0.06, 'VGLT': 0.12, 'TLT': 0.12,
-            'IEF': 0.06, 'IEI': 0.04, 'SHY': 0.02, 'VGSH': 0.02, 'VCSH': 0.03,
-            'VCIT': 0.05, 'VCLT': 0.08, 'LQD': 0.06, 'HYG': 0.08, 'JNK': 0.08,
-            'TIP': 0.05, 'VTEB': 0.04, 'MUB': 0.04, 'SCHZ': 0.04,
-            
-            # Treasury ETFs
-            'GOVT': 0.05, 'FXNAX': 0.04, 'FTRB': 0.03, 'SCHO': 0.02, 'SCHR': 0.04,
-            'SCHH': 0.06, 'VMBS': 0.03, 'MBB': 0.03,
-            
-            # International Bond ETFs
-            'BNDX': 0.05, 'VWOB': 0.08, 'EMB': 0.09, 'PCY': 0.08, 'HYEM': 0.12,
-            
-            # Commodity ETFs
-            'GLD': 0.18, 'SLV': 0.25, 'IAU': 0.18, 'PDBC': 0.20, 'DJP': 0.22,
-            'USO': 0.35, 'UNG': 0.45, 'DBA': 0.18, 'CORN': 0.25, 'WEAT': 0.28,
-            
-            # Cryptocurrency (High Volatility) - Spot prices
-            'BTC': 0.65, 'ETH': 0.75, 'BTC-USD': 0.65, 'ETH-USD': 0.75,
-            'ADA': 0.80, 'SOL': 0.85, 'DOGE': 0.90, 'BNB': 0.70, 'XRP': 0.75,
-            'MATIC': 0.85, 'AVAX': 0.90, 'DOT': 0.80, 'LINK': 0.75,
-            
-            # Leveraged ETFs (Very High Volatility)
-            'TQQQ': 0.60, 'SOXL': 0.80, 'SPXL': 0.45, 'UPRO': 0.45, 'TECL': 0.65,
-            'FAS': 0.70, 'TNA': 0.65, 'CURE': 0.60, 'DFEN': 0.55,
-            
-            # Inverse ETFs (High Volatility)
-            'SQQQ': 0.60, 'SPXS': 0.45, 'SOXS': 0.80, 'FAZ': 0.70, 'TZA': 0.65,
-            'UVXY': 1.20, 'VXX': 0.90, 'SVXY': 0.85,
-            
-            # Emerging Market Individual Stocks
-            'TSM': 0.30, 'ASML': 0.32, 'NVO': 0.25, 'TM': 0.22, 'SONY': 0.28,
-            'BABA': 0.45, 'JD': 0.50, 'PDD': 0.55, 'NIO': 0.70, 'XPEV': 0.75,
-            'LI': 0.75, 'BIDU': 0.40, 'NTES': 0.35,
-            
-            # Popular Mutual Funds (Vanguard, Fidelity, etc.)
-            'VFIAX': 0.15, 'FXAIX': 0.15, 'SWTSX': 0.16, 'VTIAX': 0.18,
-            'FTIHX': 0.18, 'VBTLX': 0.04, 'FXNAX': 0.04, 'SWAGX': 0.04,
-            'VTWAX': 0.17, 'VTSAX': 0.16, 'FZROX': 0.16, 'FZILX': 0.18,
-            
-            # Bond Mutual Funds
-            'FTRBX': 0.03, 'PTTAX': 0.03, 'VFITX': 0.04, 'FXNAX': 0.04,
-            'VTBIX': 0.05, 'FXSTX': 0.02, 'VBTIX': 0.04, 'FXTIX': 0.06,
-            
-            # Equity Mutual Funds - Large Cap
-            'FXAIX': 0.15, 'VFIAX': 0.15, 'SWPPX': 0.15, 'FSKAX': 0.16,
-            'VINIX': 0.15, 'FXAIX': 0.15, 'VTSAX': 0.16, 'SWTSX': 0.16,
-            
-            # Equity Mutual Funds - Mid/Small Cap
-            'FSMDX': 0.20, 'VIMAX': 0.20, 'FSCSX': 0.24, 'VSMAX': 0.22,
-            'FSKAX': 0.16, 'VTMGX': 0.18, 'FXNAX': 0.04,
-            
-            # International Mutual Funds
-            'FTIHX': 0.18, 'VTIAX': 0.18, 'FXNAX': 0.04, 'VTMGX': 0.18,
-            'FZILX': 0.18, 'VGTSX': 0.18, 'FDVV': 0.16, 'FXNAX': 0.04,
-            
-            # Target Date Funds (Age-based risk)
-            'FXIFX': 0.12, 'VTTSX': 0.12, 'FDKLX': 0.14, 'VTTHX': 0.14,
-            'FDEEX': 0.16, 'VFIFX': 0.16, 'FDEWX': 0.18, 'VTIVX': 0.18,
-            
-            # Small-cap and Growth (Higher Volatility)
-            'VTWO': 0.24, 'VB': 0.22, 'IJR': 0.22, 'VTEB': 0.04, 'VUG': 0.18,
-            'VOOG': 0.18, 'IWF': 0.18, 'VTV': 0.14, 'VOOV': 0.14,
-            
-            # Popular ARK ETFs (High Volatility Innovation)
-            'ARKK': 0.55, 'ARKQ': 0.50, 'ARKW': 0.52, 'ARKG': 0.48, 'ARKF': 0.50,
-        }
-    
-    def _build_asset_classifiers(self) -> Dict[str, Dict]:
-        """Build pattern-based asset type classifiers"""
-        return {
-            'crypto_patterns': [
-                'BTC', 'ETH', 'ADA', 'SOL', 'DOGE', 'BNB', 'XRP', 'MATIC', 
-                'AVAX', 'DOT', 'LINK', 'CRYPTO', '-USD'
-            ],
-            'bond_patterns': [
-                'AGG', 'BND', 'TLT', 'IEF', 'SHY', 'GOVT', 'BOND', 'TREAS',
-                'BILL', 'NOTE', 'FTRB', 'VMBS', 'MBB', 'VTEB', 'MUB', 'HYG',
-                'JNK', 'LQD', 'TIP', 'BNDX', 'EMB'
-            ],
-            'etf_patterns': [
-                'SPY', 'VOO', 'VTI', 'QQQ', 'IWM', 'XL', 'VE', 'VW', 'I',
-                'MDY', 'DIA', 'GLD', 'SLV', 'USO', 'TQQQ', 'SQQQ'
-            ],
-            'reit_patterns': [
-                'REIT', 'AMT', 'CCI', 'EQIX', 'PLD', 'WELL', 'PSA', 'EXR',
-                'AVB', 'EQR', 'VNQ', 'SCHH', 'XLRE'
-            ],
-            'mutual_fund_patterns': [
-                'VFIAX', 'FXAIX', 'SWTSX', 'VTIAX', 'FTIHX', 'VBTLX', 'FXNAX', 
-                'SWAGX', 'VTWAX', 'VTSAX', 'FZROX', 'FZILX', 'FTRBX', 'PTTAX',
-                'VFITX', 'VTBIX', 'FXSTX', 'VBTIX', 'FXTIX', 'FSMDX', 'VIMAX',
-                'FSCSX', 'VSMAX', 'FSKAX', 'VTMGX', 'VGTSX', 'FDVV', 'FXIFX',
-                'VTTSX', 'FDKLX', 'VTTHX', 'FDEEX', 'VFIFX', 'FDEWX', 'VTIVX'
-            ],
-            'leveraged_patterns': [
-                'TQQQ', 'SOXL', 'SPXL', 'UPRO', 'TECL', 'FAS', 'TNA', 'CURE',
-                'SQQQ', 'SPXS', 'SOXS', 'FAZ', 'TZA', 'UVXY', 'VXX', 'SVXY'
-            ]
+        # Bounded in-memory cache for API calls, backed by a file cache that survives restarts.
+        # TTLCache is internally locked, so worker threads can share it directly.
+        self._cache_ttl = 3600  # 1 hour default cache TTL
+        self._api_cache = TTLCache(maxsize=4096, ttl=self._cache_ttl)
+        self._cache_ttls = {
+            'fundamentals': 24 * 3600,  # company overview data changes rarely
+            'yahoo_profile': 24 * 3600,
+            'yahoo_bars': 24 * 3600,  # daily bars only change at end of day
+            'volatility_fmp': 3600
         }
+        self._disk_cache = FileCache(cache_dir) if cache_dir else None
+        # Per-symbol estimates reused across portfolio rows and requests
+        self._estimate_cache = TTLCache(maxsize=1024, ttl=self._cache_ttl)
+        self._api_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_API_CALLS)
+        # Free-tier quotas: Alpha Vantage 5 calls/minute, FMP 250 calls/day
+        self._av_limiter = RateLimiter(5, 60)
+        self._fmp_limiter = RateLimiter(250, 24 * 3600)
+        self._session = self._build_session()
+        
+    @property
+    def correlation_analyzer(self):
+        """Correlation analyzer for real correlation data, built on first portfolio estimate"""
+        if self._correlation_analyzer is None:
+            from .risk_analysis.correlation_analyzer import CorrelationAnalyzer
+            self._correlation_analyzer = CorrelationAnalyzer()
+        return self._correlation_analyzer
+        
+    @staticmethod
+    def _build_session() -> requests.Session:
+        """Shared HTTP session: keep-alive connection pool plus retries on transient errors"""
+        session = requests.Session()
+        session.headers.update({'User-Agent': 'portfolio-vol/1.0'})
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=max(10, MAX_CONCURRENT_API_CALLS),
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
     
-    def _build_sector_volatilities(self) -> Dict[str, float]:
-        """Build sector-based average volatilities for unknown stocks"""
-        return {
-            'Technology': 0.30,
-            'Biotechnology': 0.45,
-            'Healthcare': 0.25,
-            'Financial Services': 0.30,
-            'Energy': 0.38,
-            'Utilities': 0.17,
-            'Consumer Staples': 0.18,
-            'Consumer Cyclical': 0.25,
-            'Industrial': 0.22,
-            'Materials': 0.26,
-            'Real Estate': 0.24,
-            'Communication Services': 0.28,
-            'Aerospace & Defense': 0.20,
-            # Mutual Fund Categories
-            'Bond Funds': 0.04,
-            'Large-Cap Equity': 0.15,
-            'Mid-Cap Equity': 0.20,
-            'Small-Cap Equity': 0.24,
-            'International Equity': 0.18,
-            'Target Date Funds': 0.14,
-            'Balanced Funds': 0.12
-        }
+    def _get_cached_data(self, provider: str, symbol: str) -> Optional[Dict]:
+        """Get data from cache if not expired, checking memory first and then disk."""
+        key = (provider, symbol)
+        ttl = self._cache_ttls.get(provider, self._cache_ttl)
+        data = self._api_cache.get(key, ttl)
+        if data is not None:
+            return data
+        
+        if self._disk_cache is not None:
+            entry = self._disk_cache.get(provider, symbol, ttl)
+            if entry is not None:
+                # Re-hydrate with the original timestamp so the TTL still counts from the fetch
+                self._api_cache.set(key, entry[1], timestamp=entry[0])
+                return entry[1]
+        return None
     
+    def _set_cached_data(self, provider: str, symbol: str, data: Dict):
+        """Store data in memory and on disk with timestamp."""
+        timestamp = time.time()
+        self._api_cache.set((provider, symbol), data, timestamp=timestamp)
+        if self._disk_cache is not None:
+            self._disk_cache.set(provider, symbol, data, timestamp)
+        
     def get_asset_fundamentals(self, symbol: str) -> Optional[Dict]:
         """Get asset fundamentals from Alpha Vantage with caching"""
         # Check cache first
-        cache_key = f"fundamentals_{symbol}"
-        cached_data = self._get_cached_data(cache_key)
+        cached_data = self._get_cached_data('fundamentals', symbol)
         if cached_data is not None:
             return cached_data
             
         if not self.alpha_vantage_key:
             return None
+        
+        if not self._av_limiter.try_acquire():
+            print(f"Alpha Vantage rate limit reached, skipping {symbol}")
+            return None
             
         url = "https://www.alphavantage.co/query"
         params = {
@@ -252,8 +627,9 @@ class EnhancedVolatilityEstimator:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            with self._api_semaphore:
+                response = self._session.get(url, params=params, timeout=10)
+                data = _parse_json(response)
             
             if 'Symbol' in data:
                 result = {
@@ -266,7 +642,7 @@ class EnhancedVolatilityEstimator:
                     'pe_ratio': data.get('PERatio', 'N/A')
                 }
                 # Cache the result
-                self._set_cached_data(cache_key, result)
+                self._set_cached_data('fundamentals', symbol, result)
                 return result
         except Exception as e:
             print(f"Alpha Vantage API error for {symbol}: {e}")
@@ -275,13 +651,16 @@ class EnhancedVolatilityEstimator:
     def get_historical_volatility_fmp(self, symbol: str) -> Optional[float]:
         """Calculate realized volatility using Financial Modeling Prep with caching"""
         # Check cache first
-        cache_key = f"volatility_fmp_{symbol}"
-        cached_data = self._get_cached_data(cache_key)
+        cached_data = self._get_cached_data('volatility_fmp', symbol)
         if cached_data is not None:
             return cached_data
             
         if not self.fmp_key:
             return None
+        
+        if not self._fmp_limiter.try_acquire():
+            print(f"FMP rate limit reached, skipping {symbol}")
+            return None
             
         url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}"
         # `serietype=line` returns only closing NAV prices – more reliable for mutual funds
@@ -292,71 +671,168 @@ class EnhancedVolatilityEstimator:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            with self._api_semaphore:
+                response = self._session.get(url, params=params, timeout=10)
+                data = _parse_json(response)
             
-            if 'historical' in data and len(data['historical']) > 30:
-                prices = [day['close'] for day in data['historical'][-252:]]  # Last year
-                if len(prices) > 30:
-                    returns = np.diff(np.log(prices))
-                    volatility = np.std(returns) * np.sqrt(252)
-                    # Cache the result
-                    self._set_cached_data(cache_key, volatility)
-                    return volatility
+            volatility = _fmp_history_volatility(data.get('historical'))
+            if volatility is not None:
+                # Cache the result
+                self._set_cached_data('volatility_fmp', symbol, volatility)
+                return volatility
         except Exception as e:
             print(f"FMP API error for {symbol}: {e}")
             return None
     
-    def classify_asset_type(self, symbol: str) -> Tuple[str, float]:
-        """Classify asset type and estimate base volatility"""
-        symbol_upper = symbol.upper()
+    def get_historical_volatilities_fmp_batch(self, symbols) -> Dict[str, float]:
+        """Realized volatility for many symbols via FMP's comma-separated batch endpoint.
+        
+        Symbols are requested FMP_BATCH_SIZE at a time, so each request costs one unit
+        of the daily quota instead of one per symbol. Results land in the same cache
+        get_historical_volatility_fmp reads, which is how the per-ticker chain picks them up.
+        """
+        volatilities = {}
+        pending = []
+        for symbol in dict.fromkeys(symbols):
+            cached = self._get_cached_data('volatility_fmp', symbol)
+            if cached is not None:
+                volatilities[symbol] = cached
+            else:
+                pending.append(symbol)
         
-        # Check for crypto
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['crypto_patterns']):
-            return 'Cryptocurrency', 0.70
+        if not self.fmp_key:
+            return volatilities
         
-        # Check for leveraged ETFs
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['leveraged_patterns']):
-            return 'Leveraged ETF', 0.60
+        params = {
+            'apikey': self.fmp_key,
+            'serietype': 'line',
+            'timeseries': 252  # One trading year
+        }
+        for start in range(0, len(pending), FMP_BATCH_SIZE):
+            chunk = pending[start:start + FMP_BATCH_SIZE]
+            if not self._fmp_limiter.try_acquire():
+                print(f"FMP rate limit reached, skipping batch of {len(pending) - start} symbols")
+                break
+            
+            url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{','.join(chunk)}"
+            try:
+                with self._api_semaphore:
+                    response = self._session.get(url, params=params, timeout=10)
+                    data = _parse_json(response)
+                
+                # Multi-symbol responses are wrapped in historicalStockList; a lone symbol is not
+                entries = data.get('historicalStockList', [data]) if isinstance(data, dict) else []
+                for entry in entries:
+                    symbol = entry.get('symbol')
+                    volatility = _fmp_history_volatility(entry.get('historical'))
+                    if symbol in chunk and volatility is not None:
+                        self._set_cached_data('volatility_fmp', symbol, volatility)
+                        volatilities[symbol] = volatility
+            except Exception as e:
+                print(f"FMP batch API error for {','.join(chunk)}: {e}")
+        return volatilities
+    
+    def _get_yahoo_bars(self, ticker, symbol: str,
+                        prefetched: Optional[pd.DataFrame] = None) -> Optional[Dict]:
+        """One year of daily closes for a Yahoo symbol, or None if Yahoo has too little data.
+        
+        Closes are kept in the API cache (memory + disk, 24h TTL) since daily bars only
+        change at end of day, so repeat runs skip the download entirely.
+        """
+        cached = self._get_cached_data('yahoo_bars', symbol)
+        if cached is not None:
+            return cached
         
-        # Check for mutual funds (before bonds since some mutual funds contain bond patterns)
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['mutual_fund_patterns']):
-            return 'Mutual Fund', 0.15
+        if prefetched is not None:
+            hist = prefetched
+        else:
+            # Primary fetch via Ticker.history (fast)
+            hist = ticker.history(period="1y")
+            
+            # Some instruments (especially mutual funds) return an empty frame when
+            # auto-adjusted; retry unadjusted on the same Ticker (Adj Close is used below)
+            if hist is None or len(hist) < 30:
+                hist = ticker.history(period="1y", auto_adjust=False)
         
-        # Check for mutual fund patterns by suffix/structure
-        if (len(symbol_upper) == 5 and symbol_upper.endswith('X')) or \
-           (symbol_upper.startswith(('V', 'F', 'SW')) and len(symbol_upper) >= 5):
-            return 'Mutual Fund', 0.15
+        if len(hist) <= 30:
+            return None
         
-        # Check for bonds
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['bond_patterns']):
-            return 'Bond/Treasury', 0.05
+        price_col = 'Adj Close' if 'Adj Close' in hist.columns else 'Close'
+        closes = hist[price_col].to_numpy(dtype=np.float64)
+        bars = {'closes': closes[~np.isnan(closes)].tolist(), 'rows': len(hist)}
+        self._set_cached_data('yahoo_bars', symbol, bars)
+        return bars
+    
+    def _get_yahoo_profile(self, ticker, symbol: str) -> Optional[Dict]:
+        """Name / sector / quote type for a Yahoo symbol, cached like the other API data.
         
-        # Check for REITs
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['reit_patterns']):
-            return 'REIT', 0.24
+        `ticker.info` is a heavyweight scrape, so it runs at most once per symbol per
+        cache TTL. If it fails (Yahoo rate-limits it aggressively), the lean
+        `fast_info` endpoint still supplies the quote type.
+        """
+        cached = self._get_cached_data('yahoo_profile', symbol)
+        if cached is not None:
+            return cached
         
-        # Check for ETFs
-        if any(pattern in symbol_upper for pattern in self.asset_type_patterns['etf_patterns']):
-            return 'ETF', 0.18
+        try:
+            info = ticker.info
+            profile = {
+                'name': info.get('longName') or info.get('shortName'),
+                'sector': info.get('sector', 'Unknown'),
+                'asset_type': info.get('quoteType', 'Unknown')
+            }
+            self._set_cached_data('yahoo_profile', symbol, profile)
+            return profile
+        except Exception:
+            pass
         
-        # Default to individual stock
-        return 'Stock', 0.25
+        try:
+            return {'asset_type': ticker.fast_info.quote_type or 'Unknown'}
+        except Exception:
+            return None
+    
+    def classify_asset_type(self, symbol: str) -> Tuple[str, float]:
+        """Classify asset type and estimate base volatility"""
+        return _classify_upper(symbol.upper())
     
-    def estimate_enhanced_volatility(self, symbol: str, use_api: bool = True) -> Dict:
+    def estimate_enhanced_volatility(self, symbol: str, use_api: bool = True,
+                                     prefetched: Optional[pd.DataFrame] = None) -> Dict:
         """
         Enhanced volatility estimation using multiple data sources and ML classification
         
         Args:
             symbol: Asset symbol to analyze
             use_api: Whether to use external APIs for data enrichment
+            prefetched: Price history already downloaded for this symbol (skips the yfinance fetch)
             
         Returns:
             Dict with volatility estimate and metadata
         """
+        key = (symbol, use_api)
+        cached = self._estimate_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
+        result = self._estimate_enhanced_volatility(symbol, use_api, prefetched)
+        
+        # Flag estimates backed by market data. Only those are memoized: offline fallbacks
+        # are cheap to recompute and should not pin a transient network failure for the TTL
+        result['live'] = result['data_source'] in _LIVE_DATA_SOURCES
+        if result['live']:
+            self._estimate_cache.set(key, dict(result))
+        return result
+    
+    def _estimate_enhanced_volatility(self, symbol: str, use_api: bool,
+                                      prefetched: Optional[pd.DataFrame]) -> Dict:
+        """Uncached estimation chain: Yahoo history, FMP / Alpha Vantage, map, patterns"""
+        # Case-fold and normalize once; every stage below reuses these
+        symbol_upper = symbol.upper()
+        # Normalize crypto symbols to ensure we get spot prices instead of ETFs
+        normalized_symbol = _normalize_crypto_upper(symbol_upper)
+        
         result = {
             'symbol': symbol,
-            'normalized_symbol': self._normalize_crypto_symbol(symbol),  # Add normalized symbol for transparency
+            'normalized_symbol': normalized_symbol,  # Add normalized symbol for transparency
             'estimated_volatility': 0.20,  # Default fallback
             'confidence': 'Low',
             'data_source': 'Pattern Matching',
@@ -366,45 +842,39 @@ class EnhancedVolatilityEstimator:
             'name': None
         }
         
+        # Offline mode: a known asset needs no network round-trip at all
+        if not use_api and symbol_upper in self.enhanced_volatility_map:
+            return self._apply_known_asset(result, symbol_upper, symbol_upper)
+        
         # 1. Try to get historical volatility from yfinance FIRST (prioritize API data)
         try:
-            # Normalize crypto symbols to ensure we get spot prices instead of ETFs
-            normalized_symbol = self._normalize_crypto_symbol(symbol)
-            
-            # Primary fetch via Ticker.history (fast)
             ticker = yf.Ticker(normalized_symbol)
-            hist = ticker.history(period="1y")
-            
-            # Some instruments (especially mutual funds) return an empty DataFrame.
-            # Fall back to the slower but more reliable `yf.download` helper in that case.
-            if hist is None or len(hist) < 30:
-                hist = yf.download(normalized_symbol, period="1y", progress=False)
+            bars = self._get_yahoo_bars(ticker, normalized_symbol, prefetched)
 
-            if len(hist) > 30:
-                price_col = 'Adj Close' if 'Adj Close' in hist.columns else 'Close'
-                returns = hist[price_col].pct_change().dropna()
-                yf_volatility = returns.std() * np.sqrt(252)
+            yf_volatility = None
+            if bars is not None:
+                yf_volatility = _realized_volatility(np.asarray(bars['closes'], dtype=np.float64), ddof=1)
 
+            # Illiquid or stale series can give 0 / NaN; try the other sources instead
+            if _accept_vol(yf_volatility):
                 result.update({
                     'estimated_volatility': float(yf_volatility),
-                    'confidence': 'High' if len(hist) > 200 else 'Medium',
+                    'confidence': 'High' if bars['rows'] > 200 else 'Medium',
                     'data_source': 'Yahoo Finance Historical',
                     'methodology': 'Calculated Realized Volatility'
                 })
                 
                 # Get basic info if available
-                try:
-                    info = ticker.info
+                profile = self._get_yahoo_profile(ticker, normalized_symbol)
+                if profile:
                     # Populate human-readable name for display (funds often expose longName/shortName)
-                    result['name'] = info.get('longName') or info.get('shortName') or result.get('name')
-                    result['sector'] = info.get('sector', 'Unknown')
-                    result['asset_type'] = info.get('quoteType', 'Unknown')
+                    result['name'] = profile.get('name') or result.get('name')
+                    result['sector'] = profile.get('sector', 'Unknown')
+                    result['asset_type'] = profile.get('asset_type', 'Unknown')
                     
                     # Log the symbol mapping for debugging
-                    if normalized_symbol != symbol.upper():
+                    if normalized_symbol != symbol_upper:
                         print(f"Symbol mapping: {symbol} -> {normalized_symbol} (Name: {result['name']})")
-                except:
-                    pass
                     
                 return result
         except Exception as e:
@@ -412,12 +882,9 @@ class EnhancedVolatilityEstimator:
         
         # 2. Try external APIs if enabled
         if use_api:
-            # Normalize symbol for API calls
-            normalized_symbol = self._normalize_crypto_symbol(symbol)
-            
             # Try Financial Modeling Prep for historical volatility
             fmp_vol = self.get_historical_volatility_fmp(normalized_symbol)
-            if fmp_vol and 0.01 < fmp_vol < 2.0:  # Sanity check
+            if _accept_vol(fmp_vol, 0.01, 2.0):  # Sanity check
                 result.update({
                     'estimated_volatility': fmp_vol,
                     'confidence': 'High',
@@ -442,47 +909,23 @@ class EnhancedVolatilityEstimator:
                     beta = fundamentals.get('beta', 1.0)
                     adjusted_vol = sector_vol * beta
                     
-                    result.update({
-                        'estimated_volatility': adjusted_vol,
-                        'confidence': 'Medium',
-                        'data_source': 'Alpha Vantage + Sector Model',
-                        'methodology': 'Sector-Based + Beta Adjustment'
-                    })
-                    return result
-            
-            # Rate limiting for free APIs
-            time.sleep(0.1)  # Be respectful to free APIs
+                    if _accept_vol(adjusted_vol):
+                        result.update({
+                            'estimated_volatility': adjusted_vol,
+                            'confidence': 'Medium',
+                            'data_source': 'Alpha Vantage + Sector Model',
+                            'methodology': 'Sector-Based + Beta Adjustment'
+                        })
+                        return result
         
         # 3. Check enhanced volatility map as fallback (after API attempts)
         # Try both original and normalized symbols
-        normalized_symbol = self._normalize_crypto_symbol(symbol)
-        symbol_to_check = symbol.upper()
-        
-        if symbol_to_check in self.enhanced_volatility_map:
-            # Get asset type from pattern matching since hardcoded map lacks it
-            asset_type, _ = self.classify_asset_type(symbol)
-            result.update({
-                'estimated_volatility': self.enhanced_volatility_map[symbol_to_check],
-                'confidence': 'Medium',  # Lower confidence since no API enrichment
-                'data_source': 'Historical Database',
-                'asset_type': asset_type,  # Use pattern-matched asset type
-                'methodology': 'Known Asset + Pattern Classification'
-            })
-            return result
-        elif normalized_symbol in self.enhanced_volatility_map:
-            # Get asset type from pattern matching since hardcoded map lacks it
-            asset_type, _ = self.classify_asset_type(symbol)
-            result.update({
-                'estimated_volatility': self.enhanced_volatility_map[normalized_symbol],
-                'confidence': 'Medium',  # Lower confidence since no API enrichment
-                'data_source': 'Historical Database',
-                'asset_type': asset_type,  # Use pattern-matched asset type
-                'methodology': 'Known Asset + Pattern Classification'
-            })
-            return result
+        for map_symbol in (symbol_upper, normalized_symbol):
+            if map_symbol in self.enhanced_volatility_map:
+                return self._apply_known_asset(result, symbol_upper, map_symbol)
         
         # 4. Use asset type classification as final fallback
-        asset_type, base_vol = self.classify_asset_type(symbol)
+        asset_type, base_vol = _classify_upper(symbol_upper)
         result.update({
             'estimated_volatility': base_vol,
             'confidence': 'Low',
@@ -493,137 +936,117 @@ class EnhancedVolatilityEstimator:
         
         return result
     
-    def _get_crypto_symbol_mapping(self) -> Dict[str, str]:
-        """Map common crypto symbols to their Yahoo Finance spot price symbols"""
-        return {
-            'BTC': 'BTC-USD',
-            'ETH': 'ETH-USD',
-            'ADA': 'ADA-USD',
-            'SOL': 'SOL-USD',
-            'DOGE': 'DOGE-USD',
-            'BNB': 'BNB-USD',
-            'XRP': 'XRP-USD',
-            'MATIC': 'MATIC-USD',
-            'AVAX': 'AVAX-USD',
-            'DOT': 'DOT-USD',
-            'LINK': 'LINK-USD',
-            'LTC': 'LTC-USD',
-            'BCH': 'BCH-USD',
-            'XLM': 'XLM-USD',
-            'VET': 'VET-USD',
-            'TRX': 'TRX-USD',
-            'ATOM': 'ATOM-USD',
-            'NEAR': 'NEAR-USD',
-            'FTM': 'FTM-USD',
-            'ALGO': 'ALGO-USD',
-            'ICP': 'ICP-USD',
-            'FIL': 'FIL-USD',
-            'THETA': 'THETA-USD',
-            'XTZ': 'XTZ-USD',
-            'EOS': 'EOS-USD',
-            'AAVE': 'AAVE-USD',
-            'UNI': 'UNI-USD',
-            'SUSHI': 'SUSHI-USD',
-            'COMP': 'COMP-USD',
-            'MKR': 'MKR-USD',
-            'YFI': 'YFI-USD',
-            'SNX': 'SNX-USD',
-            'CRV': 'CRV-USD',
-            'BAL': 'BAL-USD',
-            'REN': 'REN-USD',
-            'ZRX': 'ZRX-USD',
-            'BAT': 'BAT-USD',
-            'MANA': 'MANA-USD',
-            'SAND': 'SAND-USD',
-            'ENJ': 'ENJ-USD',
-            'CHZ': 'CHZ-USD',
-            'HOT': 'HOT-USD',
-            'ANKR': 'ANKR-USD',
-            'ONE': 'ONE-USD',
-            'HARMONY': 'ONE-USD',
-            'IOTA': 'IOTA-USD',
-            'NEO': 'NEO-USD',
-            'GAS': 'GAS-USD',
-            'ONT': 'ONT-USD',
-            'QTUM': 'QTUM-USD',
-            'ICX': 'ICX-USD',
-            'ZIL': 'ZIL-USD',
-            'ZEN': 'ZEN-USD',
-            'RVN': 'RVN-USD',
-            'XMR': 'XMR-USD',
-            'DASH': 'DASH-USD',
-            'ZEC': 'ZEC-USD',
-            'XEM': 'XEM-USD',
-            'WAVES': 'WAVES-USD',
-            'OMG': 'OMG-USD',
-            'KNC': 'KNC-USD',
-            'STORJ': 'STORJ-USD',
-            'SKL': 'SKL-USD',
-            'GRT': 'GRT-USD',
-            '1INCH': '1INCH-USD',
-            'CAKE': 'CAKE-USD',
-            'BAKE': 'BAKE-USD',
-            'DODO': 'DODO-USD',
-            'ALPHA': 'ALPHA-USD',
-            'PERP': 'PERP-USD',
-            'RLC': 'RLC-USD',
-            'OCEAN': 'OCEAN-USD',
-            'BAND': 'BAND-USD',
-            'NMR': 'NMR-USD',
-            'MLN': 'MLN-USD',
-            'REP': 'REP-USD',
-            'KEEP': 'KEEP-USD',
-            'NU': 'NU-USD',
-            'UMA': 'UMA-USD',
-            'BADGER': 'BADGER-USD',
-            'FARM': 'FARM-USD',
-            'PICKLE': 'PICKLE-USD',
-            'CREAM': 'CREAM-USD',
-            'COVER': 'COVER-USD',
-            'HEGIC': 'HEGIC-USD',
-            'API3': 'API3-USD',
-            'POND': 'POND-USD',
-            'ALPHA': 'ALPHA-USD',
-            'PERP': 'PERP-USD',
-            'RLC': 'RLC-USD',
-            'OCEAN': 'OCEAN-USD',
-            'BAND': 'BAND-USD',
-            'NMR': 'NMR-USD',
-            'MLN': 'MLN-USD',
-            'REP': 'REP-USD',
-            'KEEP': 'KEEP-USD',
-            'NU': 'NU-USD',
-            'UMA': 'UMA-USD',
-            'BADGER': 'BADGER-USD',
-            'FARM': 'FARM-USD',
-            'PICKLE': 'PICKLE-USD',
-            'CREAM': 'CREAM-USD',
-            'COVER': 'COVER-USD',
-            'HEGIC': 'HEGIC-USD',
-            'API3': 'API3-USD',
-            'POND': 'POND-USD',
-        }
+    def lookup_many(self, symbols) -> np.ndarray:
+        """Enhanced-map volatility for each symbol (case-insensitive), NaN where unknown"""
+        idx = _VOL_MAP_INDEX.get_indexer([str(s).upper() for s in symbols])
+        # Widen at the return boundary so callers get the usual float64 array
+        return np.where(idx >= 0, _VOL_MAP_VALUES[idx].astype(np.float64), np.nan)
+    
+    def _apply_known_asset(self, result: Dict, symbol_upper: str, map_symbol: str) -> Dict:
+        """Fill result from the enhanced volatility map entry for map_symbol"""
+        # Get asset type from pattern matching since hardcoded map lacks it
+        asset_type, _ = _classify_upper(symbol_upper)
+        result.update({
+            'estimated_volatility': self.enhanced_volatility_map[map_symbol],
+            'confidence': 'Medium',  # Lower confidence since no API enrichment
+            'data_source': 'Historical Database',
+            'asset_type': asset_type,  # Use pattern-matched asset type
+            'methodology': 'Known Asset + Pattern Classification'
+        })
+        return result
     
     def _normalize_crypto_symbol(self, symbol: str) -> str:
         """Normalize cryptocurrency symbols to ensure we get spot prices instead of ETFs"""
-        symbol_upper = symbol.upper()
-        crypto_mapping = self._get_crypto_symbol_mapping()
+        return _normalize_crypto_upper(symbol.upper())
+    
+    def _prefetch_histories(self, tickers) -> Optional[Dict[str, pd.DataFrame]]:
+        """Download one year of prices for all tickers in a single batched yfinance call.
         
-        # If it's a known crypto symbol, map to spot price
-        if symbol_upper in crypto_mapping:
-            return crypto_mapping[symbol_upper]
+        Returns a dict keyed by original ticker; tickers Yahoo returned nothing for are
+        left out so estimate_enhanced_volatility falls back to its per-ticker fetch.
+        Returns None when the batched download itself failed or came back empty.
+        """
+        symbol_map = {}
+        for t in tickers:
+            symbol = self._normalize_crypto_symbol(t)
+            if self._get_cached_data('yahoo_bars', symbol) is None:
+                symbol_map.setdefault(symbol, []).append(t)
+        if len(symbol_map) < 2:
+            return {}
         
-        # If it already has -USD suffix, return as is
-        if symbol_upper.endswith('-USD'):
-            return symbol_upper
+        try:
+            data = yf.download(list(symbol_map), period="1y", group_by='ticker',
+                               auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            print(f"Batch Yahoo Finance download failed: {e}")
+            return None
         
-        # If it's a 3-4 letter symbol that might be crypto, try adding -USD
-        if len(symbol_upper) <= 4 and symbol_upper.isalpha():
-            # Check if it's in our crypto patterns
-            if any(pattern in symbol_upper for pattern in self.asset_type_patterns['crypto_patterns']):
-                return f"{symbol_upper}-USD"
+        if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return None
         
-        return symbol_upper
+        histories = {}
+        available = set(data.columns.get_level_values(0))
+        for symbol, originals in symbol_map.items():
+            if symbol not in available:
+                continue
+            # Calendars differ across assets (e.g. crypto trades weekends), so drop the padding rows
+            hist = data[symbol].dropna(how='all')
+            if len(hist) > 30:
+                for t in originals:
+                    histories[t] = hist
+        return histories
+    
+    def _prewarm_fmp(self, tickers, histories: Dict[str, pd.DataFrame]):
+        """Batch-fetch FMP volatility for tickers that neither Yahoo path could serve.
+        
+        Tickers the batched download missed get their per-ticker Yahoo fetch here (the
+        bars land in the cache the estimation chain reads), so FMP is only asked about
+        symbols that really fall through to it. Confirmed misses get an empty history in
+        `histories` so the chain does not repeat the Yahoo request.
+        """
+        symbol_map = {}
+        for t in tickers:
+            if t not in histories:
+                symbol_map.setdefault(self._normalize_crypto_symbol(t), []).append(t)
+        if len(symbol_map) < 2:
+            return
+        
+        def yahoo_volatility(symbol):
+            try:
+                bars = self._get_yahoo_bars(yf.Ticker(symbol), symbol)
+            except Exception as e:
+                logger.debug("Yahoo Finance error for %s: %s", symbol, e)
+                return None
+            if bars is None:
+                return None
+            return _realized_volatility(np.asarray(bars['closes'], dtype=np.float64), ddof=1)
+        
+        workers = min(MAX_VOLATILITY_WORKERS, len(symbol_map))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            volatilities = list(executor.map(yahoo_volatility, symbol_map))
+        
+        misses = [symbol for symbol, vol in zip(symbol_map, volatilities) if not _accept_vol(vol)]
+        for symbol, vol in zip(symbol_map, volatilities):
+            if vol is None:
+                for t in symbol_map[symbol]:
+                    histories[t] = pd.DataFrame()
+        if len(misses) > 1:
+            self.get_historical_volatilities_fmp_batch(misses)
+    
+    def _estimate_many(self, tickers, use_apis: bool,
+                       histories: Optional[Dict[str, pd.DataFrame]] = None) -> list:
+        """Run estimate_enhanced_volatility for each ticker on a thread pool"""
+        histories = histories or {}
+        
+        def estimate(t):
+            return self.estimate_enhanced_volatility(t, use_api=use_apis, prefetched=histories.get(t))
+        
+        if len(tickers) <= 1:
+            return [estimate(t) for t in tickers]
+        
+        workers = min(MAX_VOLATILITY_WORKERS, len(tickers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(estimate, tickers))
     
     def estimate_portfolio_volatility_enhanced(self, portfolio_df: pd.DataFrame, 
                                              use_apis: bool = True) -> Dict:
@@ -641,20 +1064,33 @@ class EnhancedVolatilityEstimator:
             raise ValueError("Portfolio DataFrame must have 'Ticker' and 'Weight' columns")
         
         # Normalize weights
-        weights = portfolio_df['Weight'].values
-        weights = weights / weights.sum()
+        weights = portfolio_df['Weight'].to_numpy(dtype=np.float64, copy=True)
+        weights /= weights.sum()
         
         asset_volatilities = []
         asset_details = []
         
         print(f"Analyzing {len(portfolio_df)} assets with enhanced volatility estimation...")
         
-        for i, (_, row) in enumerate(portfolio_df.iterrows()):
-            ticker = row['Ticker']
-            weight = weights[i]
-            
-            # Get enhanced volatility estimate
-            vol_result = self.estimate_enhanced_volatility(ticker, use_api=use_apis)
+        # Get enhanced volatility estimates concurrently; results keep portfolio order
+        tickers = portfolio_df['Ticker'].tolist()
+        # Split lots / the same fund across accounts repeat tickers; estimate each once
+        unique_tickers = list(dict.fromkeys(tickers))
+        # Offline runs answer known assets from the map, so only download the rest
+        if use_apis:
+            to_fetch = unique_tickers
+        else:
+            unknown = np.isnan(self.lookup_many(unique_tickers))
+            to_fetch = [t for t, is_unknown in zip(unique_tickers, unknown) if is_unknown]
+        histories = self._prefetch_histories(to_fetch)
+        # A failed batch download says nothing about single tickers; leave every ticker to
+        # its own chain (per-ticker Yahoo first, then FMP) rather than spending FMP quota
+        if histories is not None and use_apis and self.fmp_key:
+            self._prewarm_fmp(to_fetch, histories)
+        estimates = dict(zip(unique_tickers, self._estimate_many(unique_tickers, use_apis, histories)))
+        vol_results = [estimates[t] for t in tickers]
+        
+        for ticker, weight, vol_result in zip(tickers, weights, vol_results):
             asset_vol = vol_result['estimated_volatility']
             
             asset_volatilities.append(asset_vol)
@@ -673,79 +1109,113 @@ class EnhancedVolatilityEstimator:
             print(f"  {ticker}: {asset_vol:.1%} ({vol_result['confidence']} confidence, {vol_result['data_source']})")
         
         # Calculate portfolio volatility using real correlations from CorrelationAnalyzer
-        asset_volatilities = np.array(asset_volatilities)
+        # Estimates carry ~2 significant digits, so the reduction arrays use float32
+        asset_volatilities = np.asarray(asset_volatilities, dtype=np.float32)
+        # Per-asset w_i * sigma_i; off-diagonal sum under a constant correlation is
+        # (sum w_i*sigma_i)^2 - sum (w_i*sigma_i)^2, so no pairwise loop is needed
+        weighted_vols = weights.astype(np.float32) * asset_volatilities
         
         # Weighted average approach (conservative)
-        weighted_avg_vol = np.sum(weights * asset_volatilities)
+        weighted_avg_vol = float(weighted_vols.sum())
         
         # Get real correlation data from CorrelationAnalyzer
         correlation_result = self.correlation_analyzer.analyze_portfolio_correlations(portfolio_df)
+        correlation_success = correlation_result.get('success', False)
         
-        if correlation_result['success'] and len(portfolio_df) > 1:
+        # Only the correlation input differs between methods; the variance is computed once below
+        corr = None
+        if correlation_success and len(portfolio_df) > 1:
+            avg_correlation = correlation_result.get('average_correlation', 0.6)
             # Use actual correlation matrix if available
             try:
                 correlation_matrix = pd.DataFrame(correlation_result['correlation_matrix'])
                 
-                # Calculate portfolio volatility using real correlations
-                variance_sum = np.sum((weights * asset_volatilities) ** 2)
-                covariance_sum = 0
-                
-                for i in range(len(weights)):
-                    for j in range(len(weights)):
-                        if i != j:
-                            # Get correlation from matrix (handle potential missing values)
-                            corr_value = correlation_matrix.iloc[i, j]
-                            if pd.isna(corr_value):
-                                corr_value = 0.6  # Fallback to assumption if correlation is missing
-                            covariance_sum += weights[i] * weights[j] * asset_volatilities[i] * asset_volatilities[j] * corr_value
-                
-                portfolio_volatility = np.sqrt(variance_sum + covariance_sum)
-                correlation_method = "Real Correlation Matrix"
-                avg_correlation = correlation_result.get('average_correlation', 0.6)
+                if correlation_matrix.empty:
+                    # The analyzer's fallback result carries no pairs (and a placeholder 0.0
+                    # average), so nothing was measured: use the assumption instead
+                    avg_correlation = 0.6
+                    correlation_method = "Assumption (0.6 correlation)"
+                elif not set(tickers).issubset(correlation_matrix.index):
+                    # Some tickers had no price data; only the analyzed pairs' average is real
+                    correlation_method = "Average Correlation from Analysis"
+                else:
+                    # Align to portfolio rows by ticker (the analyzer collapses repeated ones).
+                    # float32 like weighted_vols: large portfolios then run single-precision BLAS
+                    # on half the bytes, with error far below the 0.1% the result is shown at
+                    corr = correlation_matrix.reindex(index=tickers, columns=tickers).to_numpy(dtype=np.float32)
+                    corr = np.nan_to_num(corr, nan=0.6)  # Fallback to assumption if a pair is NaN
+                    np.fill_diagonal(corr, 1.0)
+                    correlation_method = "Real Correlation Matrix"
                 
             except Exception as e:
-                print(f"Error using real correlation matrix: {e}")
+                logger.debug("Error using real correlation matrix: %s", e)
                 # Fall back to average correlation approach
-                avg_correlation = correlation_result.get('average_correlation', 0.6)
-                variance_sum = np.sum((weights * asset_volatilities) ** 2)
-                covariance_sum = avg_correlation * np.sum([
-                    weights[i] * weights[j] * asset_volatilities[i] * asset_volatilities[j]
-                    for i in range(len(weights))
-                    for j in range(len(weights))
-                    if i != j
-                ])
-                portfolio_volatility = np.sqrt(variance_sum + covariance_sum)
+                corr = None
                 correlation_method = "Average Correlation from Analysis"
         else:
             # Fall back to assumption-based approach
             avg_correlation = 0.6
-            variance_sum = np.sum((weights * asset_volatilities) ** 2)
-            covariance_sum = avg_correlation * np.sum([
-                weights[i] * weights[j] * asset_volatilities[i] * asset_volatilities[j]
-                for i in range(len(weights))
-                for j in range(len(weights))
-                if i != j
-            ])
-            portfolio_volatility = np.sqrt(variance_sum + covariance_sum)
             correlation_method = "Assumption (0.6 correlation)"
         
+        if corr is not None:
+            # Portfolio variance as the quadratic form u' C u with u_i = w_i * sigma_i
+            portfolio_variance = _correlation_variance(weighted_vols, corr)
+        else:
+            # A constant correlation needs no N x N matrix (rank-1 identity, O(N))
+            portfolio_variance = _constant_correlation_variance(weighted_vols, avg_correlation)
+        
+        # Report plain Python floats so float32 scalars never reach the JSON encoder
+        # A non-PSD correlation input can push the variance below zero; clamp like the batch path
+        portfolio_volatility = math.sqrt(max(portfolio_variance, 0.0))
+        
+        confidence_counts = Counter(detail['confidence'] for detail in asset_details)
+        
         return {
             'portfolio_volatility': portfolio_volatility,
             'weighted_average_volatility': weighted_avg_vol,
             'diversification_benefit': weighted_avg_vol - portfolio_volatility,
             'asset_details': asset_details,
             'confidence_distribution': {
-                'high': sum(1 for detail in asset_details if detail['confidence'] == 'High'),
-                'medium': sum(1 for detail in asset_details if detail['confidence'] == 'Medium'),
-                'low': sum(1 for detail in asset_details if detail['confidence'] == 'Low')
+                'high': confidence_counts['High'],
+                'medium': confidence_counts['Medium'],
+                'low': confidence_counts['Low']
             },
             'correlation_analysis': {
                 'method_used': correlation_method,
                 'average_correlation': avg_correlation,
-                'correlation_success': correlation_result.get('success', False),
+                'correlation_success': correlation_success,
                 'correlation_data': correlation_result
             }
         }
+    
+    @staticmethod
+    def estimate_portfolio_volatility_batch(weights_matrix, asset_volatilities,
+                                            correlation_matrix) -> np.ndarray:
+        """
+        Volatility of many portfolios over the same assets in one matrix product
+        
+        Args:
+            weights_matrix: (B, N) weights, one portfolio per row (rows are normalized here)
+            asset_volatilities: (N,) annualized asset volatilities
+            correlation_matrix: (N, N) asset correlations; missing entries count as 0.6
+            
+        Columns of weights_matrix, asset_volatilities and both axes of correlation_matrix
+        must all list the assets in the same order.
+            
+        Returns:
+            (B,) array of portfolio volatilities
+        """
+        weights = np.atleast_2d(np.asarray(weights_matrix, dtype=np.float64))
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        # Row b of U is u_b = w_b * sigma, so portfolio b's variance is u_b' C u_b
+        weighted_vols = weights * np.asarray(asset_volatilities, dtype=np.float64)
+        
+        corr = np.nan_to_num(np.asarray(correlation_matrix, dtype=np.float64), nan=0.6)
+        np.fill_diagonal(corr, 1.0)
+        
+        # One GEMM for all portfolios, then a row-wise dot: diag(U C U')
+        variances = np.einsum('bi,bi->b', weighted_vols @ corr, weighted_vols)
+        return np.sqrt(np.maximum(variances, 0.0))
 
 # Example usage and testing
 if __name__ == "__main__":
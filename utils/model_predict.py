@@ -1,48 +1,115 @@
+import copy
 import logging
+import threading
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split # Still useful for splitting historical data for evaluation
-from sklearn.metrics import mean_squared_error # To evaluate model performance (RMSE)
-import yfinance as yf
-from datetime import datetime, timedelta
-from utils.simple_model_trainer import PortfolioVolatilityTrainer
+from utils._ttl_cache import TTLCache
 
 # Setup logging for this module
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)  # Reduce verbosity for API usage
 
-# Global cache for models to avoid reloading on every request
-_enhanced_model_cache = None
+# Global cache for models to avoid reloading on every request.
+# Each getter builds its model under a lock so concurrent first requests share one instance.
+_NOT_LOADED = object()
+_enhanced_model_cache = _NOT_LOADED
 _original_trainer_cache = None
+_enhanced_model_lock = threading.Lock()
+_original_trainer_lock = threading.Lock()
 
 def _get_cached_enhanced_model():
     """Get cached enhanced model instance to avoid reloading on every request."""
     global _enhanced_model_cache
-    if _enhanced_model_cache is None:
-        try:
-            from utils.volatility_model_enhancer import VolatilityModelEnhancer
-            _enhanced_model_cache = VolatilityModelEnhancer()
-            logger.info("Initialized enhanced model cache")
-        except Exception as e:
-            logger.warning(f"Failed to initialize enhanced model cache: {e}")
-            _enhanced_model_cache = None
+    if _enhanced_model_cache is _NOT_LOADED:
+        with _enhanced_model_lock:
+            if _enhanced_model_cache is _NOT_LOADED:
+                try:
+                    from utils.volatility_model_enhancer import VolatilityModelEnhancer
+                    _enhanced_model_cache = VolatilityModelEnhancer()
+                    logger.info("Initialized enhanced model cache")
+                except Exception as e:
+                    # Cache the failure too, so every request doesn't retry a broken import
+                    logger.warning(f"Failed to initialize enhanced model cache: {e}")
+                    _enhanced_model_cache = None
     return _enhanced_model_cache
 
 def _get_cached_original_trainer():
     """Get cached original trainer instance to avoid reloading on every request."""
     global _original_trainer_cache
     if _original_trainer_cache is None:
-        _original_trainer_cache = PortfolioVolatilityTrainer()
-        try:
-            model_path = "model/portfolio_volatility_model.pkl"
-            _original_trainer_cache.load_model(model_path)
-            logger.info("Loaded original model into cache")
-        except Exception as e:
-            logger.warning(f"Failed to load original model into cache: {e}")
+        with _original_trainer_lock:
+            if _original_trainer_cache is None:
+                # Deferred: the trainer module pulls in sklearn, yfinance and joblib
+                from utils.simple_model_trainer import PortfolioVolatilityTrainer
+                trainer = PortfolioVolatilityTrainer()
+                try:
+                    model_path = "model/portfolio_volatility_model.pkl"
+                    trainer.load_model(model_path)
+                    logger.info("Loaded original model into cache")
+                except Exception as e:
+                    logger.warning(f"Failed to load original model into cache: {e}")
+                # Publish only once fully loaded so other threads never see a half-built trainer
+                _original_trainer_cache = trainer
     return _original_trainer_cache
 
+# Recent enhanced predictions keyed by portfolio fingerprint, so a re-submitted portfolio
+# skips the whole estimation pipeline (market-data inputs are themselves cached ~1h).
+# Only fully live responses are kept: a map/pattern fallback after a transient API
+# failure must not be pinned for the hour
+_prediction_cache = TTLCache(maxsize=512, ttl=3600)
+
+def _is_live_response(result: dict) -> bool:
+    """True when every asset's estimate came from live market data."""
+    return all(detail.get('live', False) for detail in result['asset_details'])
+
+def _portfolio_fingerprint(portfolio_df: pd.DataFrame, forecast_days: int) -> tuple:
+    """Hashable key of (ticker, weight) rows in order, plus the forecast horizon."""
+    tickers = portfolio_df['Ticker'].astype(str).tolist()
+    weights = np.round(portfolio_df['Weight'].to_numpy(dtype=np.float64), 6).tolist()
+    return forecast_days, tuple(zip(tickers, weights))
+
+def warmup():
+    """Load the cached models and compile optional kernels ahead of the first request."""
+    _get_cached_enhanced_model()
+    _get_cached_original_trainer()
+    from utils.enhanced_volatility_estimator import warmup_kernels
+    warmup_kernels()
+    logger.info("Model caches warmed up")
+
+def _portfolio_records(portfolio_df: pd.DataFrame) -> list:
+    """Row dicts for the API response, zipped from column lists instead of DataFrame.to_dict('records')."""
+    columns = portfolio_df.columns.tolist()
+    return [dict(zip(columns, row)) for row in zip(*(portfolio_df[c].tolist() for c in columns))]
+
+def _normalized_weights(portfolio_df: pd.DataFrame) -> np.ndarray:
+    """Portfolio weights as a float32 array summing to 1 (ample for percentage-level output)."""
+    weights = portfolio_df['Weight'].to_numpy(dtype=np.float32, copy=True)
+    weights /= weights.sum(dtype=np.float32)
+    return weights
+
 # === Enhanced Prediction Interface for API ===
 
+def _format_enhanced_response(result: dict, portfolio_df: pd.DataFrame, forecast_days: int) -> dict:
+    """Shape a VolatilityModelEnhancer result into the API response."""
+    return {
+        "forecast_days": forecast_days,
+        "predicted_volatility": result['predicted_volatility'],
+        "risk_level": result['interpretation']['risk_level'],
+        "annual_volatility": result['interpretation']['annual_volatility_pct'],
+        "description": result['interpretation']['description'],
+        "current_features": {},
+        "portfolio_assets": _portfolio_records(portfolio_df),
+        "model_type": "enhanced_multi_source",
+        "enhancement_data": {
+            "coverage_analysis": result['coverage_analysis'],
+            "confidence_distribution": result['confidence_distribution'],
+            "overall_confidence": result['overall_confidence'],
+            "asset_details": result['asset_details'],
+            "data_sources_used": result['data_sources_used']
+        },
+        "correlation_analysis": result.get('correlation_analysis', {})
+    }
+
 def predict_volatility(portfolio_df: pd.DataFrame, forecast_days: int = 20):
     """
     Enhanced portfolio volatility prediction with improved asset coverage.
@@ -57,40 +124,32 @@ def predict_volatility(portfolio_df: pd.DataFrame, forecast_days: int = 20):
     logger.info(f"Starting enhanced volatility prediction for portfolio with {len(portfolio_df)} assets")
     
     try:
+        fingerprint = _portfolio_fingerprint(portfolio_df, forecast_days)
+        cached = _prediction_cache.get(fingerprint)
+        if cached is not None:
+            logger.info("Returning cached prediction for identical portfolio")
+            # Deep copies both ways: callers may mutate the nested dicts they get back
+            response = copy.deepcopy(cached)
+            response["portfolio_assets"] = _portfolio_records(portfolio_df)
+            return response
+        
         # Use cached enhanced model
         enhancer = _get_cached_enhanced_model()
-        
-        if enhancer is not None:
-            logger.info("Using cached enhanced volatility model with improved asset coverage")
-            result = enhancer.predict_volatility_enhanced(
-                portfolio_df, 
-                forecast_days=forecast_days, 
-                use_apis=True  # Enable API usage since we have keys
-            )
-            
-            # Format result to match expected API response
-            return {
-                "forecast_days": forecast_days,
-                "predicted_volatility": result['predicted_volatility'],
-                "risk_level": result['interpretation']['risk_level'],
-                "annual_volatility": result['interpretation']['annual_volatility_pct'],
-                "description": result['interpretation']['description'],
-                "current_features": {},
-                "portfolio_assets": portfolio_df.to_dict('records'),
-                "model_type": "enhanced_multi_source",
-                "enhancement_data": {
-                    "coverage_analysis": result['coverage_analysis'],
-                    "confidence_distribution": result['confidence_distribution'],
-                    "overall_confidence": result['overall_confidence'],
-                    "asset_details": result['asset_details'],
-                    "data_sources_used": result['data_sources_used']
-                },
-                "correlation_analysis": result.get('correlation_analysis', {})
-            }
-        else:
+        if enhancer is None:
             logger.warning("Enhanced model not available. Falling back to original model.")
             return predict_volatility_original(portfolio_df, forecast_days)
         
+        logger.info("Using cached enhanced volatility model with improved asset coverage")
+        result = enhancer.predict_volatility_enhanced(
+            portfolio_df, 
+            forecast_days=forecast_days, 
+            use_apis=True  # Enable API usage since we have keys
+        )
+        response = _format_enhanced_response(result, portfolio_df, forecast_days)
+        if _is_live_response(result):
+            _prediction_cache.set(fingerprint, copy.deepcopy(response))
+        return response
+        
     except Exception as e:
         logger.error(f"Error in enhanced prediction: {str(e)}", exc_info=True)
         logger.info("Falling back to original volatility prediction")
@@ -125,17 +184,18 @@ def predict_volatility_original(portfolio_df: pd.DataFrame, forecast_days: int =
             
             # For retail investors, use asset-based calculation instead of training on limited data
             logger.info("Using asset-based volatility calculation for retail portfolio")
-            weights = portfolio_df['Weight'].values / portfolio_df['Weight'].values.sum()
-            asset_vol = trainer._estimate_portfolio_volatility(portfolio_df, weights)
+            weights = _normalized_weights(portfolio_df)
+            asset_vol = trainer._calculate_asset_volatility(portfolio_df, weights)
+            interpretation = trainer._interpret_prediction(asset_vol)
             
             return {
                 "forecast_days": forecast_days,
                 "predicted_volatility": [asset_vol] * forecast_days,
-                "risk_level": trainer._interpret_prediction(asset_vol)['risk_level'],
-                "annual_volatility": trainer._interpret_prediction(asset_vol)['annual_volatility_pct'],
-                "description": trainer._interpret_prediction(asset_vol)['description'],
+                "risk_level": interpretation['risk_level'],
+                "annual_volatility": interpretation['annual_volatility_pct'],
+                "description": interpretation['description'],
                 "current_features": {},
-                "portfolio_assets": portfolio_df.to_dict('records'),
+                "portfolio_assets": _portfolio_records(portfolio_df),
                 "model_type": "asset_based_estimation"
             }
         
@@ -153,7 +213,7 @@ def predict_volatility_original(portfolio_df: pd.DataFrame, forecast_days: int =
             "annual_volatility": result['interpretation']['annual_volatility_pct'],
             "description": result['interpretation']['description'],
             "current_features": result.get('current_features', {}),
-            "portfolio_assets": portfolio_df.to_dict('records'),
+            "portfolio_assets": _portfolio_records(portfolio_df),
             "model_type": "historical_random_forest"
         }
         
@@ -171,24 +231,25 @@ def predict_volatility_simple_fallback(portfolio_df: pd.DataFrame, forecast_days
     logger.info("Using simple asset-based volatility calculation")
     
     try:
-        # Initialize trainer for basic calculations
-        trainer = PortfolioVolatilityTrainer()
+        # Reuse the cached trainer; basic calculations don't need its model to be loaded
+        trainer = _get_cached_original_trainer()
         
         # Calculate basic portfolio volatility
-        weights = portfolio_df['Weight'].values / portfolio_df['Weight'].values.sum()
-        asset_vol = trainer._estimate_portfolio_volatility(portfolio_df, weights)
+        weights = _normalized_weights(portfolio_df)
+        asset_vol = trainer._calculate_asset_volatility(portfolio_df, weights)
         
         # Generate simple forecast (constant volatility)
         forecast_values = [asset_vol] * forecast_days
+        interpretation = trainer._interpret_prediction(asset_vol)
         
         return {
             "forecast_days": forecast_days,
             "predicted_volatility": forecast_values,
-            "risk_level": trainer._interpret_prediction(asset_vol)['risk_level'],
-            "annual_volatility": trainer._interpret_prediction(asset_vol)['annual_volatility_pct'],
-            "description": trainer._interpret_prediction(asset_vol)['description'],
+            "risk_level": interpretation['risk_level'],
+            "annual_volatility": interpretation['annual_volatility_pct'],
+            "description": interpretation['description'],
             "current_features": {},
-            "portfolio_assets": portfolio_df.to_dict('records'),
+            "portfolio_assets": _portfolio_records(portfolio_df),
             "model_type": "asset_based_estimation"
         }
         
@@ -9,6 +9,7 @@ import yfinance as yf
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
+from .._ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,8 @@ class CorrelationAnalyzer:
             lookback_days: Number of trading days to use for correlation calculation
         """
         self.lookback_days = lookback_days
+        # Correlation statistics per ticker set; daily prices make an hour-old result fine
+        self._correlation_cache = TTLCache(maxsize=256, ttl=3600)
         
     def analyze_portfolio_correlations(self, portfolio_df: pd.DataFrame) -> Dict:
         """
@@ -37,38 +40,24 @@ class CorrelationAnalyzer:
             Dict containing correlation analysis results
         """
         try:
-            # Get price data for all assets
-            price_data = self._fetch_price_data(portfolio_df['Ticker'].tolist())
-            
-            if price_data.empty:
-                return self._create_fallback_result(portfolio_df)
-            
-            # Calculate correlation matrix
-            try:
-                correlation_matrix = price_data.corr()
-                
-                # Check if correlation matrix is valid
-                if correlation_matrix.empty or correlation_matrix.isna().all().all():
-                    logger.warning("Correlation matrix is empty or all NaN")
+            # Price-derived statistics depend only on the ticker set, so reuse them
+            # across portfolios that hold the same assets
+            tickers = portfolio_df['Ticker'].tolist()
+            cache_key = tuple(sorted(set(tickers)))
+            correlations = self._correlation_cache.get(cache_key)
+            if correlations is None:
+                correlations = self._compute_correlations(tickers)
+                if correlations is None:
                     return self._create_fallback_result(portfolio_df)
-                
-                # Find most correlated pair
-                most_correlated = self._find_most_correlated_pair(correlation_matrix)
-                
-                # Calculate average correlation
-                avg_correlation = self._calculate_average_correlation(correlation_matrix)
-                
-            except Exception as e:
-                logger.error(f"Error calculating correlations: {str(e)}")
-                return self._create_fallback_result(portfolio_df)
+                self._correlation_cache.set(cache_key, correlations)
             
             # Calculate portfolio concentration metrics
             concentration_metrics = self._calculate_concentration_metrics(portfolio_df)
             
             return {
-                'most_correlated_pair': most_correlated,
-                'average_correlation': avg_correlation,
-                'correlation_matrix': correlation_matrix.to_dict(),
+                'most_correlated_pair': correlations['most_correlated_pair'],
+                'average_correlation': correlations['average_correlation'],
+                'correlation_matrix': correlations['correlation_matrix'],
                 'concentration_metrics': concentration_metrics,
                 'total_assets': len(portfolio_df),
                 'analysis_period_days': self.lookback_days,
@@ -79,6 +68,44 @@ class CorrelationAnalyzer:
             logger.error(f"Error in correlation analysis: {str(e)}")
             return self._create_fallback_result(portfolio_df)
     
+    def _compute_correlations(self, tickers: List[str]) -> Optional[Dict]:
+        """
+        Fetch prices and compute the correlation statistics for a set of tickers.
+        
+        Args:
+            tickers: List of ticker symbols
+            
+        Returns:
+            Dict with correlation matrix, most correlated pair and average correlation,
+            or None if there is not enough data
+        """
+        # Get price data for all assets
+        price_data = self._fetch_price_data(tickers)
+        
+        if price_data.empty:
+            return None
+        
+        # Calculate correlation matrix
+        try:
+            correlation_matrix = price_data.corr()
+            
+            # Check if correlation matrix is valid
+            if correlation_matrix.empty or correlation_matrix.isna().all().all():
+                logger.warning("Correlation matrix is empty or all NaN")
+                return None
+            
+            return {
+                # Find most correlated pair
+                'most_correlated_pair': self._find_most_correlated_pair(correlation_matrix),
+                # Calculate average correlation
+                'average_correlation': self._calculate_average_correlation(correlation_matrix),
+                'correlation_matrix': correlation_matrix.to_dict()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error calculating correlations: {str(e)}")
+            return None
+    
     def _fetch_price_data(self, tickers: List[str]) -> pd.DataFrame:
         """
         Fetch price data for portfolio assets.
@@ -465,12 +465,10 @@ class PortfolioVolatilityTrainer:
                 price_df = pd.DataFrame(stock_data).dropna()
                 if not price_df.empty:
                     returns = price_df.pct_change().dropna()
-                    # Calculate weighted average volatility
-                    weighted_vol = 0
-                    for i, ticker in enumerate(portfolio_df['Ticker']):
-                        if ticker in returns.columns:
-                            ticker_vol = returns[ticker].std() * np.sqrt(252)
-                            weighted_vol += weights[i] * ticker_vol
+                    # Calculate weighted average volatility over the tickers that have data
+                    ticker_vols = returns.std().reindex(tickers).to_numpy() * np.sqrt(252)
+                    has_data = np.isin(tickers, returns.columns)
+                    weighted_vol = float(np.dot(np.asarray(weights)[has_data], ticker_vols[has_data]))
                     
                     if weighted_vol > 0:
                         return weighted_vol
@@ -142,6 +142,7 @@ class VolatilityModelEnhancer:
             'confidence': enhanced_result['confidence'].lower(),
             'method': enhanced_result['methodology'],
             'data_source': enhanced_result['data_source'],
+            'live': enhanced_result['live'],
             'asset_type': enhanced_result['asset_type'],
             'sector': enhanced_result['sector'],
             'name': enhanced_result.get('name')
@@ -189,6 +190,7 @@ class VolatilityModelEnhancer:
                 'confidence': vol_result['confidence'],
                 'source': vol_result['source'],
                 'method': vol_result.get('method', 'unknown'),
+                'live': vol_result.get('live', False),
                 'asset_type': vol_result.get('asset_type', 'Unknown'),
                 'sector': vol_result.get('sector', 'Unknown'),
                 'name': vol_result.get('name')